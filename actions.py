@@ -0,0 +1,225 @@
+"""
+Gesture -> action dispatch.
+
+An ActionRegistry maps gesture names to actions and runs them off the calling
+thread, so a slow shell command or webhook never blocks capture, inference or
+the GUI. Each binding has a timeout and a cooldown: while an action is
+running, or within `cooldown` seconds of its last start, further triggers of
+the same binding are ignored.
+
+Shell commands and webhooks enforce their own timeout and share a small
+thread pool. Python callables cannot be stopped from outside, so each call
+gets its own thread and a watchdog: when the timeout elapses the binding is
+marked timed out and released, and the call is left to finish on its own.
+Callables must therefore be cooperative - return promptly, or watch
+context["deadline"] - or their threads pile up.
+
+Actions:
+
+    ShellAction(command)        run a shell command (subprocess, killed on timeout)
+    CallableAction(func)        call func(context) on its own thread (timeout not enforced)
+    WebhookAction(url)          POST the context as JSON to a local HTTP endpoint
+    DryRunAction()              record the call and do nothing (tests, rehearsals)
+
+parse_action_spec() builds one from a command-line spec such as
+"shell:notify-send hi", "webhook:http://127.0.0.1:8080/hook" or "dry-run".
+"""
+import json
+import subprocess
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+LOCAL_HOSTS = ("localhost", "127.0.0.1", "::1")
+
+
+class ShellAction:
+    enforces_timeout = True
+
+    def __init__(self, command):
+        self.command = command
+
+    def __call__(self, context, timeout):
+        # TimeoutExpired kills the child and propagates as the action's error
+        completed = subprocess.run(self.command, shell=True, timeout=timeout,
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        if completed.returncode:
+            stderr = completed.stderr.decode(errors="replace").strip()
+            raise RuntimeError(f"exit status {completed.returncode}: {stderr}")
+
+    def __str__(self):
+        return f"shell: {self.command}"
+
+
+class CallableAction:
+    """
+    Calls `func(context)`, with context["deadline"] the time.monotonic() by
+    which it should return. Python threads cannot be killed: a call that
+    overruns is abandoned by the registry, not stopped.
+    """
+
+    enforces_timeout = False
+
+    def __init__(self, func):
+        self.func = func
+
+    def __call__(self, context, timeout):
+        self.func(dict(context, deadline=time.monotonic() + timeout))
+
+    def __str__(self):
+        return f"callable: {getattr(self.func, '__name__', self.func)}"
+
+
+class WebhookAction:
+    """POSTs the trigger context as JSON. Only local endpoints are allowed."""
+
+    enforces_timeout = True
+
+    def __init__(self, url):
+        host = urlparse(url).hostname
+        if host not in LOCAL_HOSTS:
+            raise ValueError(f"Webhook must point to a local endpoint, got {host!r}")
+        self.url = url
+
+    def __call__(self, context, timeout):
+        request = urllib.request.Request(
+            self.url, data=json.dumps(context).encode(), method="POST",
+            headers={"Content-Type": "application/json"},
+        )
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+
+    def __str__(self):
+        return f"webhook: {self.url}"
+
+
+class DryRunAction:
+    """Records every call instead of acting; `calls` holds the contexts."""
+
+    enforces_timeout = True  # Returns at once
+
+    def __init__(self, label="dry run"):
+        self.label = label
+        self.calls = []
+
+    def __call__(self, context, timeout):
+        self.calls.append(context)
+
+    def __str__(self):
+        return self.label
+
+
+def parse_action_spec(spec):
+    """'shell:CMD', 'webhook:URL' or 'dry-run' -> action."""
+    kind, _, argument = spec.partition(":")
+    if kind == "shell" and argument:
+        return ShellAction(argument)
+    if kind == "webhook" and argument:
+        return WebhookAction(argument)
+    if kind == "dry-run":
+        return DryRunAction()
+    raise ValueError(f"Unknown action spec {spec!r} (expected shell:CMD, webhook:URL or dry-run)")
+
+
+class Binding:
+    def __init__(self, gesture, action, timeout, cooldown, on_done):
+        self.gesture = gesture
+        self.action = action
+        self.timeout = timeout
+        self.cooldown = cooldown
+        self.on_done = on_done
+        self.running = False
+        self.last_started = None
+        self.runs = 0  # Also identifies the current run, see ActionRegistry._finish
+        self.failures = 0
+        self.timeouts = 0
+
+
+class ActionRegistry:
+    """
+    Gesture name -> actions. Actions that enforce their own timeout run on a
+    thread pool of `max_workers`; callables get a thread each (see above).
+    `log` receives one human readable line per start, failure and timeout.
+    """
+
+    def __init__(self, log=print, max_workers=2):
+        self.log = log
+        self.bindings = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="action")
+
+    def register(self, gesture, action, timeout=10.0, cooldown=5.0, on_done=None):
+        """Bind `action` to `gesture`; several actions per gesture run independently."""
+        binding = Binding(gesture, action, timeout, cooldown, on_done)
+        self.bindings.setdefault(gesture, []).append(binding)
+        return binding
+
+    def unregister(self, gesture):
+        self.bindings.pop(gesture, None)
+
+    def dispatch(self, gesture, context=None):
+        """
+        Start every action bound to `gesture` that is idle and out of cooldown.
+        Never blocks; returns the list of bindings that were started.
+        """
+        started = []
+        now = time.monotonic()
+        with self._lock:
+            for binding in self.bindings.get(gesture, ()):
+                if binding.running:
+                    continue
+                if binding.last_started is not None and now - binding.last_started < binding.cooldown:
+                    continue
+                binding.running = True
+                binding.last_started = now
+                binding.runs += 1
+                started.append(binding)
+        for binding in started:
+            self.log(f"ACTION {binding.gesture} -> {binding.action}")
+            args = (binding, dict(context or {}, gesture=gesture), binding.runs)
+            if getattr(binding.action, "enforces_timeout", False):
+                self._executor.submit(self._run, *args)
+            else:
+                # A hung callable must not hold a pool worker other actions need
+                threading.Thread(target=self._run, args=args, name=f"action-{gesture}", daemon=True).start()
+                watchdog = threading.Timer(binding.timeout, self._expire, (binding, binding.runs))
+                watchdog.daemon = True
+                watchdog.start()
+        return started
+
+    def _run(self, binding, context, run):
+        start = time.monotonic()
+        error = None
+        try:
+            binding.action(context, binding.timeout)
+        except subprocess.TimeoutExpired:
+            error = f"timed out after {binding.timeout:g}s"
+        except Exception as e:
+            error = str(e) or type(e).__name__
+        elapsed = time.monotonic() - start
+        if error is None and elapsed > binding.timeout:
+            error = f"took {elapsed:.1f}s, over its {binding.timeout:g}s timeout"
+        self._finish(binding, run, error)
+
+    def _expire(self, binding, run):
+        """Watchdog: release a binding whose callable is still running at its timeout."""
+        if self._finish(binding, run, f"timed out after {binding.timeout:g}s, abandoned (still running)"):
+            binding.timeouts += 1
+
+    def _finish(self, binding, run, error):
+        """End run number `run` once, whichever of the action and its watchdog comes first."""
+        with self._lock:
+            if not binding.running or binding.runs != run:
+                return False  # Already expired; a late return changes nothing
+            binding.running = False
+        if error:
+            binding.failures += 1
+            self.log(f"ERROR: Action {binding.action} failed: {error}")
+        if binding.on_done:
+            binding.on_done(binding, error)
+        return True
+
+    def shutdown(self, wait=False):
+        self._executor.shutdown(wait=wait)
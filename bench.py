@@ -0,0 +1,411 @@
+"""
+Per-stage latency benchmark, no webcam required.
+
+    python bench.py synthetic --frames 300
+    python bench.py recordings/clip.mp4 --output bench.json
+    python bench.py frames_dir/ --no-gui
+    python bench.py synthetic --check-allocations
+
+Each stage of the frame path is timed separately and reported as JSON with
+p50/p95/p99 latency and throughput, so runs can be diffed between commits.
+--check-allocations instead drives GestureEngine's capture, inference and
+presentation stages (a stand-in for MediaPipe) under tracemalloc and fails if
+a warmed-up frame allocates more than a few KiB. --check-roi runs ROI-cropped
+inference next to a full-frame pass and fails unless crops were actually used
+and their remapped landmarks match (add --model to use MediaPipe on a clip
+that shows a hand).
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from contextlib import contextmanager
+
+import cv2
+import numpy as np
+from buffers import FrameRing
+from capture import open_source
+from display import DisplayRenderer
+from engine import create_hands
+from gestures import decide_gesture, hand_count, landmarks_to_array, handedness_codes
+
+VIDEO_SIZE = (500, 600)  # Video label size in the GUI
+# Bytes a warmed-up frame may allocate on the frame path: packet, results and
+# landmark arrays, a few small numpy views - never anything frame-sized
+ALLOCATION_LIMIT = 16 * 1024
+
+# Stages that make up "camera frame in -> gesture decision out"
+DETECTION_STAGES = ("flip", "cvtColor", "hands.process", "gesture_eval")
+
+
+def reference_hand():
+    """A plausible open hand, used for the drawing stages when nothing is detected."""
+    points = np.zeros((21, 3), dtype=np.float32)
+    points[0] = (0.5, 0.8, 0.0)
+    for finger, dx in enumerate((-0.14, -0.06, 0.0, 0.06, 0.12)):
+        for joint in range(4):
+            points[1 + finger * 4 + joint] = (
+                0.5 + dx * (1 + 0.35 * joint),
+                0.72 - 0.07 * (joint + 1) + (0.08 if finger == 0 else 0.0),
+                -0.01 * joint,
+            )
+    return points
+
+
+class BlobHands:
+    """
+    Hands stand-in for the checks: "detects" the skin-toned blob of the
+    synthetic source and returns reference_hand() fitted into its bounding box,
+    normalized to the image it was given - like the model, crops included.
+    """
+
+    SKIN_RGB = (210, 160, 120)
+    TOLERANCE = 20
+
+    def __init__(self):
+        self.lower = np.array([c - self.TOLERANCE for c in self.SKIN_RGB], dtype=np.uint8)
+        self.upper = np.array([c + self.TOLERANCE for c in self.SKIN_RGB], dtype=np.uint8)
+        self.hand = reference_hand()
+        # Reference hand rescaled to its own bounding box, (0..1, 0..1)
+        lo, hi = self.hand[:, :2].min(axis=0), self.hand[:, :2].max(axis=0)
+        self.unit = self.hand.copy()
+        self.unit[:, :2] = (self.hand[:, :2] - lo) / (hi - lo)
+        self.unit[:, 2] /= hi[0] - lo[0]
+        self._mask = None
+
+    def process(self, rgb):
+        from shm_inference import ArrayResults
+        if self._mask is None or self._mask.shape != rgb.shape[:2]:
+            self._mask = np.empty(rgb.shape[:2], dtype=np.uint8)
+        cv2.inRange(rgb, self.lower, self.upper, dst=self._mask)
+        x, y, w, h = cv2.boundingRect(self._mask)
+        if not w or not h:
+            return ArrayResults.empty()
+        height, width = rgb.shape[:2]
+        points = np.empty((1, 21, 3), dtype=np.float32)
+        points[0, :, 0] = (x + self.unit[:, 0] * w) / width
+        points[0, :, 1] = (y + self.unit[:, 1] * h) / height
+        points[0, :, 2] = self.unit[:, 2] * w / width  # MediaPipe z is in units of the image width
+        return ArrayResults(points, np.ones(1, dtype=np.int8))
+
+    def close(self):
+        pass
+
+
+class StageTimer:
+    def __init__(self):
+        self.samples = defaultdict(list)
+
+    @contextmanager
+    def time(self, stage):
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.samples[stage].append(time.perf_counter_ns() - start)
+
+    def add(self, stage, duration_ns):
+        self.samples[stage].append(duration_ns)
+
+
+def summarize(samples_ns):
+    ms = np.asarray(samples_ns, dtype=np.float64) / 1e6
+    mean = float(ms.mean())
+    p50, p95, p99 = np.percentile(ms, (50, 95, 99))
+    return {
+        "count": int(ms.size),
+        "mean_ms": round(mean, 4),
+        "p50_ms": round(float(p50), 4),
+        "p95_ms": round(float(p95), 4),
+        "p99_ms": round(float(p99), 4),
+        "max_ms": round(float(ms.max()), 4),
+        "throughput_fps": round(1000.0 / mean, 1) if mean > 0 else None,
+    }
+
+
+def create_gui_targets():
+    """A hidden Tk root with a canvas, or (None, reason) without a display."""
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+        root.withdraw()
+        canvas = tk.Canvas(root, width=380, height=580)
+        return root, canvas
+    except Exception as e:  # TclError without a display, ImportError without Tk
+        return None, str(e)
+
+
+def run_benchmark(source, frames=300, warmup=10, gui=True):
+    timer = StageTimer()
+    report = {"startup": {}, "skipped": {}}
+
+    start = time.perf_counter_ns()
+    hands = create_hands()
+    report["startup"]["model_init_ms"] = round((time.perf_counter_ns() - start) / 1e6, 2)
+
+    root = canvas = renderer = photo = None
+    if gui:
+        root, canvas = create_gui_targets()
+        if root is None:
+            report["skipped"]["photoimage"] = report["skipped"]["virtual_hand"] = canvas
+        else:
+            from PIL import ImageTk
+            from virtual_hand import VirtualHandRenderer
+            renderer = VirtualHandRenderer(canvas)
+            # One persistent PhotoImage updated in place, like presenter.FramePresenter
+            photo = ImageTk.PhotoImage("RGB", VIDEO_SIZE)
+    else:
+        report["skipped"]["photoimage"] = report["skipped"]["virtual_hand"] = "--no-gui"
+
+    display = DisplayRenderer(VIDEO_SIZE)
+    surface = display.new_surface()
+    frames_ring, rgb_ring = FrameRing(), FrameRing()
+    fallback_points = reference_hand()[None]
+
+    measured = 0
+    detected = 0
+    index = 0
+    frame_shape = None
+    wall_start = None
+    while measured < frames:
+        success, image = source.read()
+        if not success:
+            break
+        frame_shape = image.shape
+        if index == warmup:
+            timer.samples.clear()
+            wall_start = time.perf_counter()
+        index += 1
+
+        frame_start = time.perf_counter_ns()
+        with timer.time("flip"):
+            image = cv2.flip(image, 1, dst=frames_ring.next(image.shape))
+        with timer.time("cvtColor"):
+            rgb_image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB, dst=rgb_ring.next(image.shape))
+        with timer.time("hands.process"):
+            results = hands.process(rgb_image)
+        if index == 1:
+            report["startup"]["first_inference_ms"] = round(timer.samples["hands.process"][0] / 1e6, 2)
+
+        # Gesture and drawing stages run on the reference hand when nothing
+        # is detected, so synthetic input still exercises them
+        with timer.time("gesture_eval"):
+            if results.multi_hand_landmarks:
+                points = landmarks_to_array(results)
+                handedness = handedness_codes(results)
+            else:
+                points = fallback_points
+                handedness = np.zeros(1, dtype=np.int8)
+            decide_gesture(points, handedness)
+        timer.add("detection", time.perf_counter_ns() - frame_start)
+        if results.multi_hand_landmarks:
+            detected += index > warmup
+
+        with timer.time("display_render"):
+            # Letterbox to the label size, then draw the skeleton at that size
+            display.render(rgb_image, points, surface)
+        if root is not None:
+            with timer.time("photoimage"):
+                photo.paste(surface.image)
+            with timer.time("virtual_hand"):
+                renderer.update(points[0])
+                root.update_idletasks()
+        measured += index > warmup
+
+    hands.close()
+    if root is not None:
+        photo = None  # Before its Tk interpreter goes away
+        root.destroy()
+    if not measured:
+        raise RuntimeError("Source produced no frames after warm-up")
+
+    wall = time.perf_counter() - wall_start
+    report["frames"] = measured
+    report["frame_shape"] = list(frame_shape)
+    report["hand_detected_ratio"] = round(detected / measured, 3)
+    report["pipeline_fps"] = round(measured / wall, 1)
+    report["stages"] = {stage: summarize(samples) for stage, samples in timer.samples.items()}
+    return report
+
+
+def check_allocations(source, frames=300, warmup=10):
+    """
+    Run the engine's own frame path - GestureEngine.capture_frame,
+    infer_frame (BlobHands standing in for MediaPipe, gesture decision
+    included) and present_frame into a DisplayRenderer and FrameBuffer like
+    the GUI's - under tracemalloc. After `warmup` frames, the memory traced per
+    frame must stay under ALLOCATION_LIMIT bytes and must not grow.
+    """
+    from engine import GestureEngine
+    from presenter import FrameBuffer
+
+    engine = GestureEngine(log_interval=float("inf"))
+    engine.cap = source
+    engine.hands = BlobHands()
+    display = DisplayRenderer(VIDEO_SIZE)
+    buffer = FrameBuffer()
+
+    def render_frame(packet):
+        surface = buffer.back(display.new_surface)
+        display.render(packet.rgb, packet.points, surface)
+        buffer.publish(surface)
+        # The Tk side: take the newest frame and hand it back once "pasted"
+        buffer.take()
+        buffer.done()
+
+    engine.subscribe("frame", render_frame)
+
+    def process():
+        packet = engine.capture_frame()
+        if packet is None:
+            return False
+        engine.present_frame(engine.infer_frame(packet))
+        return True
+
+    # Running totals only: a list of per-frame samples would itself grow
+    measured = max_peak = total_peak = 0
+    start_current = None
+    tracemalloc.start()
+    try:
+        for n in range(warmup + frames):
+            if n == warmup:
+                start_current = tracemalloc.get_traced_memory()[0]
+            before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            if not process():
+                break
+            if n >= warmup:
+                peak = tracemalloc.get_traced_memory()[1] - before
+                max_peak = max(max_peak, peak)
+                total_peak += peak
+                measured += 1
+        growth = tracemalloc.get_traced_memory()[0] - start_current if start_current is not None else 0
+    finally:
+        tracemalloc.stop()
+    if not measured:
+        raise RuntimeError("Source produced no frames after warm-up")
+
+    frame = engine._raw_frame
+    return {
+        "frames": measured,
+        "frame_shape": list(frame.shape),
+        "frame_bytes": frame.nbytes,
+        "max_bytes_per_frame": max_peak,
+        "mean_bytes_per_frame": round(total_peak / measured),
+        "net_growth_bytes": growth,
+        "limit_bytes": ALLOCATION_LIMIT,
+        "ring_allocations": engine._frames.allocations + engine._rgb_frames.allocations,
+        "ok": max_peak < ALLOCATION_LIMIT and growth < ALLOCATION_LIMIT,
+    }
+
+
+def check_roi(source, frames=300, model=False, tolerance=None):
+    """
+    Run AdaptiveInference with ROI crops next to a plain full-frame pass on the
+    same frames and compare the remapped crop landmarks with the full-frame
+    ones. With `model` both use MediaPipe, so the source must show a hand;
+    otherwise BlobHands stands in and the synthetic source is enough (this
+    checks the crop geometry and remapping exactly, not the model).
+    """
+    from inference import AdaptiveInference
+    if model:
+        full = create_hands(static_image_mode=True)
+        inference = AdaptiveInference(create_hands(), roi=True, crop_hands=create_hands(static_image_mode=True))
+        tolerance = 0.02 if tolerance is None else tolerance
+    else:
+        full = BlobHands()
+        inference = AdaptiveInference(BlobHands(), roi=True, crop_hands=BlobHands())
+        tolerance = 1e-4 if tolerance is None else tolerance
+
+    errors = []
+    try:
+        for _ in range(frames):
+            success, image = source.read()
+            if not success:
+                break
+            rgb = cv2.cvtColor(cv2.flip(image, 1), cv2.COLOR_BGR2RGB)
+            roi_before = inference.roi_frames
+            results = inference.process(rgb)
+            if inference.roi_frames == roi_before:
+                continue  # Full-frame answer, nothing to compare
+            reference = full.process(rgb)
+            if hand_count(reference) and hand_count(results):
+                a = landmarks_to_array(results)[0, :, :2]
+                b = landmarks_to_array(reference)[0, :, :2]
+                errors.append(float(np.abs(a - b).max()))
+    finally:
+        full.close()
+        inference.hands.close()
+        inference.crop_hands.close()
+
+    stats = inference.stats()
+    return {
+        "model": "mediapipe" if model else "blob stand-in",
+        "frames": stats["roi_frames"] + stats["full_frames"],
+        "roi_frames": stats["roi_frames"],
+        "full_frames": stats["full_frames"],
+        "fallbacks": stats["fallbacks"],
+        "compared": len(errors),
+        "mean_error": round(float(np.mean(errors)), 6) if errors else None,
+        "max_error": round(float(np.max(errors)), 6) if errors else None,
+        "tolerance": tolerance,
+        # No ROI frames means the crop path was never exercised: a failure, not a pass
+        "ok": bool(errors) and max(errors) <= tolerance,
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Per-stage latency benchmark for the gesture monitor")
+    parser.add_argument("source", help="video file, image directory, 'synthetic[:WxH]' or camera index")
+    parser.add_argument("--frames", type=int, default=300, help="frames to measure (default: 300)")
+    parser.add_argument("--warmup", type=int, default=10, help="frames discarded before measuring")
+    parser.add_argument("--no-gui", action="store_true", help="skip the PhotoImage and canvas stages")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    parser.add_argument("--check-allocations", action="store_true",
+                        help="check the frame path for per-frame allocations with tracemalloc instead")
+    parser.add_argument("--check-roi", action="store_true",
+                        help="compare ROI-crop landmarks with a full-frame pass instead")
+    parser.add_argument("--model", action="store_true",
+                        help="--check-roi with MediaPipe (the source must show a hand) instead of a stand-in")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    source = open_source(args.source, loop=True)
+    if not source.isOpened():
+        print(f"ERROR: Could not open source {args.source!r}", file=sys.stderr)
+        return 1
+    try:
+        if args.check_allocations:
+            report = check_allocations(source, args.frames, args.warmup)
+        elif args.check_roi:
+            report = check_roi(source, args.frames, args.model)
+        else:
+            report = run_benchmark(source, args.frames, args.warmup, gui=not args.no_gui)
+    finally:
+        source.release()
+
+    report["source"] = args.source
+    report["environment"] = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "opencv": cv2.__version__,
+        # Only when a stage loaded it: create_hands() imports MediaPipe on demand
+        "mediapipe": getattr(sys.modules.get("mediapipe"), "__version__", None),
+        "numpy": np.__version__,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    return 0 if report.get("ok", True) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,36 @@
+"""
+Preallocated frame buffers for the per-frame hot loop.
+
+OpenCV functions write into an existing array when it is passed as `dst=`
+with the right shape and type, so the capture and inference stages cycle
+through a FrameRing instead of allocating a new image per frame. A frame
+handed to the next stage stays valid until the ring comes round to its slot
+again: the ring must be longer than the number of frames that can be in
+flight at once (see FRAME_RING_SIZE).
+"""
+import numpy as np
+
+# Frames in flight in a FramePipeline with queue_size=1: one being captured,
+# one queued for and one in inference, one queued for and one in presentation.
+# Three spare slots keep a slow presentation stage well clear of the writer.
+FRAME_RING_SIZE = 8
+
+
+class FrameRing:
+    """`count` reusable arrays, (re)allocated only when the requested shape changes."""
+
+    def __init__(self, count=FRAME_RING_SIZE, dtype=np.uint8):
+        self.count = count
+        self.dtype = dtype
+        self.allocations = 0
+        self._slots = [None] * count
+        self._next = 0
+
+    def next(self, shape):
+        """The next slot as an uninitialized array of `shape`."""
+        slot = self._slots[self._next]
+        if slot is None or slot.shape != shape:
+            slot = self._slots[self._next] = np.empty(shape, dtype=self.dtype)
+            self.allocations += 1
+        self._next = (self._next + 1) % self.count
+        return slot
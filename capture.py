@@ -0,0 +1,314 @@
+"""
+Frame sources.
+
+Every source mimics the part of cv2.VideoCapture the app uses - read(),
+isOpened() and release() - so recorded video, a directory of images or a
+synthetic generator can stand in for the webcam (benchmarks, tests, kiosks
+without a camera). settings() reports what a source actually delivers.
+Like VideoCapture.read(image), read() fills a passed array of the right shape
+in place instead of allocating a new frame where the source can.
+
+Cameras are opened through CameraSource, which negotiates the pixel format
+(MJPG by default, so USB webcams are not limited to low YUYV frame rates),
+resolution, frame rate and a one-frame driver buffer, then keeps calling
+grab() on its own thread. read() only decodes (retrieve()) the newest grabbed
+frame, so a frame that sat in the driver queue is never the one processed.
+"""
+import os
+import threading
+import time
+
+import cv2
+import numpy as np
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+
+
+class VideoFileSource:
+    """Frames from a video file, optionally looping and/or paced at the file's FPS."""
+
+    def __init__(self, path, loop=False, realtime=False):
+        self.path = path
+        self.loop = loop
+        self.realtime = realtime
+        self._cap = cv2.VideoCapture(path)
+        fps = self._cap.get(cv2.CAP_PROP_FPS) if self._cap.isOpened() else 0
+        self._interval = 1.0 / fps if fps and realtime else 0
+        self._next_frame_at = 0
+
+    def isOpened(self):
+        return self._cap.isOpened()
+
+    def read(self, image=None):
+        if self._interval:
+            delay = self._next_frame_at - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            self._next_frame_at = time.monotonic() + self._interval
+        success, frame = self._cap.read(image)
+        if not success and self.loop:
+            self._cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            success, frame = self._cap.read(image)
+        return success, frame
+
+    def release(self):
+        self._cap.release()
+
+    def settings(self):
+        return {
+            "source": "video",
+            "path": self.path,
+            "width": int(self._cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            "height": int(self._cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            "fps": self._cap.get(cv2.CAP_PROP_FPS),
+            "realtime": self.realtime,
+        }
+
+
+class ImageDirectorySource:
+    """Frames from the image files in a directory, in name order."""
+
+    def __init__(self, path, loop=False):
+        self.path = path
+        self.loop = loop
+        self.files = sorted(
+            os.path.join(path, name) for name in os.listdir(path)
+            if name.lower().endswith(IMAGE_EXTENSIONS)
+        )
+        self._index = 0
+
+    def isOpened(self):
+        return bool(self.files)
+
+    def read(self, image=None):
+        # imread always decodes into a new array
+        if self._index >= len(self.files):
+            if not self.loop or not self.files:
+                return False, None
+            self._index = 0
+        image = cv2.imread(self.files[self._index])
+        self._index += 1
+        return image is not None, image
+
+    def release(self):
+        self.files = []
+
+    def settings(self):
+        return {"source": "images", "path": self.path, "files": len(self.files)}
+
+
+class SyntheticSource:
+    """
+    Deterministic generated frames (moving gradient plus a skin-toned blob), no
+    camera or files needed. `frames=None` generates forever.
+    """
+
+    def __init__(self, width=640, height=480, frames=None, fps=0):
+        self.width = width
+        self.height = height
+        self.frames = frames
+        self._interval = 1.0 / fps if fps else 0
+        self._index = 0
+        self._opened = True
+        ramp = np.linspace(0, 255, width, dtype=np.float32)
+        self._background = np.repeat(np.tile(ramp, (height, 1))[:, :, None], 3, axis=2).astype(np.uint8)
+
+    def isOpened(self):
+        return self._opened
+
+    def read(self, image=None):
+        if not self._opened or (self.frames is not None and self._index >= self.frames):
+            return False, None
+        if self._interval:
+            time.sleep(self._interval)
+        if image is None or image.shape != self._background.shape:
+            image = np.empty_like(self._background)
+        # np.roll without the temporary
+        shift = self._index * 4 % self.width
+        image[:, shift:] = self._background[:, :self.width - shift]
+        image[:, :shift] = self._background[:, self.width - shift:]
+        center = (
+            int(self.width / 2 + self.width / 4 * np.sin(self._index / 15)),
+            int(self.height / 2 + self.height / 6 * np.cos(self._index / 20)),
+        )
+        cv2.ellipse(image, center, (60, 90), 0, 0, 360, (120, 160, 210), -1)  # BGR skin tone
+        self._index += 1
+        return True, image
+
+    def release(self):
+        self._opened = False
+
+    def settings(self):
+        return {
+            "source": "synthetic",
+            "width": self.width,
+            "height": self.height,
+            "fps": 1.0 / self._interval if self._interval else None,
+        }
+
+
+def fourcc_name(code):
+    code = int(code)
+    return "".join(chr((code >> (8 * i)) & 0xFF) for i in range(4)).strip("\0") if code > 0 else None
+
+
+class CameraSource:
+    """
+    A camera opened with the requested format, size, frame rate and driver
+    buffer size (None keeps the driver default). With `latest`, a grab thread
+    drains the camera continuously and read() returns the newest frame not
+    returned before, waiting up to `timeout` seconds for one.
+    """
+
+    def __init__(self, index, width=None, height=None, fps=None, fourcc="MJPG", buffer_size=1,
+                 latest=True, timeout=1.0):
+        self.index = index
+        self.latest = latest
+        self.timeout = timeout
+        self.requested = {"fourcc": fourcc, "width": width, "height": height, "fps": fps,
+                          "buffer_size": buffer_size}
+        self.captured_at = None  # time.monotonic() of the last returned frame's grab
+        self.grabbed = 0
+        self.stale = 0  # Frames grabbed but replaced by a newer one before anyone read them
+        self._cap = cv2.VideoCapture(index)
+        # FOURCC first: many drivers only offer the larger sizes and rates in MJPG
+        if fourcc:
+            self._cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*fourcc))
+        if width:
+            self._cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        if height:
+            self._cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        if fps:
+            self._cap.set(cv2.CAP_PROP_FPS, fps)
+        if buffer_size:
+            self._cap.set(cv2.CAP_PROP_BUFFERSIZE, buffer_size)
+
+        # grab() and retrieve() must never overlap on one VideoCapture; both run
+        # outside the lock, these flags keep them apart
+        self._cond = threading.Condition()
+        self._sequence = 0  # Grabs so far
+        self._returned = 0  # Sequence of the last frame read() returned
+        self._grabbed_at = None
+        self._grabbing = False
+        self._retrieving = False
+        self._waiting = 0  # read() calls waiting for a frame
+        self._failed = False
+        self._running = False
+        self._thread = None
+        if latest and self._cap.isOpened():
+            self._running = True
+            self._thread = threading.Thread(target=self._grab_loop, name=f"camera-{index}-grab", daemon=True)
+            self._thread.start()
+
+    def isOpened(self):
+        return self._cap.isOpened()
+
+    def _grab_loop(self):
+        while self._running:
+            with self._cond:
+                # A waiting reader gets the frame already grabbed before the next grab starts
+                self._cond.wait_for(lambda: not self._running or not (
+                    self._retrieving or (self._waiting and self._sequence > self._returned)), 0.1)
+                if not self._running:
+                    break
+                if self._retrieving or (self._waiting and self._sequence > self._returned):
+                    continue
+                self._grabbing = True
+            # Blocks until the driver has a frame; decoding is left to retrieve()
+            success = self._cap.grab()
+            with self._cond:
+                self._grabbing = False
+                if success:
+                    if self._sequence > self._returned:
+                        self.stale += 1
+                    self._sequence += 1
+                    self.grabbed += 1
+                    self._grabbed_at = time.monotonic()
+                self._failed = not success
+                self._cond.notify_all()
+            if not success:
+                time.sleep(0.1)  # Unplugged or busy camera: do not spin
+
+    def read(self, image=None):
+        if not self.latest:
+            success, image = self._cap.read(image)
+            self.captured_at = time.monotonic()
+            return success, image
+        with self._cond:
+            self._waiting += 1
+            try:
+                ready = self._cond.wait_for(
+                    lambda: not self._running or self._failed
+                    or (self._sequence > self._returned and not self._grabbing), self.timeout)
+            finally:
+                self._waiting -= 1
+            if not ready or not self._running or self._sequence <= self._returned or self._grabbing:
+                return False, None
+            self._retrieving = True
+            self._returned = self._sequence
+            captured_at = self._grabbed_at
+        try:
+            success, image = self._cap.retrieve(image)
+        finally:
+            with self._cond:
+                self._retrieving = False
+                self._cond.notify_all()
+        self.captured_at = captured_at
+        return success, image
+
+    def release(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(2.0)
+            self._thread = None
+        self._cap.release()
+
+    def settings(self):
+        """What the driver accepted, next to what was requested."""
+        cap = self._cap
+        try:
+            backend = cap.getBackendName()
+        except cv2.error:
+            backend = None
+        return {
+            "source": "camera",
+            "index": self.index,
+            "backend": backend,
+            "fourcc": fourcc_name(cap.get(cv2.CAP_PROP_FOURCC)),
+            "width": int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            "height": int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            "fps": cap.get(cv2.CAP_PROP_FPS),
+            "buffer_size": int(cap.get(cv2.CAP_PROP_BUFFERSIZE)),
+            "grab_thread": self.latest,
+            "requested": self.requested,
+        }
+
+
+def describe_settings(settings):
+    """One log line for a settings() dict."""
+    skip = ("source", "requested")
+    text = ", ".join(f"{key} {value}" for key, value in settings.items() if key not in skip and value is not None)
+    return f"{settings['source']}: {text}"
+
+
+def open_source(spec, loop=False, camera_options=None):
+    """
+    Open a frame source from a command-line style spec:
+    an integer camera index, 'synthetic' / 'synthetic:WIDTHxHEIGHT',
+    a directory of images, or a video file path. `camera_options` are
+    CameraSource keyword arguments, used for camera indices only.
+    """
+    spec = str(spec)
+    if spec.isdigit():
+        return CameraSource(int(spec), **(camera_options or {}))
+    if spec.startswith("synthetic"):
+        _, _, size = spec.partition(":")
+        if size:
+            width, height = (int(v) for v in size.lower().split("x"))
+            return SyntheticSource(width, height)
+        return SyntheticSource()
+    if os.path.isdir(spec):
+        return ImageDirectorySource(spec, loop=loop)
+    return VideoFileSource(spec, loop=loop)
@@ -0,0 +1,105 @@
+"""
+Display-resolution rendering of the live feed.
+
+DisplayRenderer scales each RGB camera frame into a preallocated surface of
+the video label's size, keeping the aspect ratio (black letterbox bars), and
+then draws the hand skeleton on the scaled image, so the overlay costs
+display pixels rather than camera pixels. Each surface is a NumPy array for
+OpenCV plus a PIL image for Tk that the finished frame is copied into in place
+(Pillow keeps RGB as 4 bytes per pixel, so the two cannot share memory);
+nothing frame-sized is allocated once the first frames are through.
+"""
+import cv2
+import numpy as np
+from PIL import Image
+
+from gestures import NUM_LANDMARKS
+from virtual_hand import SKELETAL_CONNECTIONS
+
+LANDMARK_COLOR = (255, 0, 0)  # RGB
+LANDMARK_RADIUS = 4
+CONNECTION_COLOR = (0, 255, 0)
+THICKNESS = 2
+MAX_HANDS = 2
+
+
+def letterbox_rect(src_size, dst_size):
+    """(x, y, width, height) of `src_size` fitted inside `dst_size`, centred, aspect kept."""
+    src_w, src_h = src_size
+    dst_w, dst_h = dst_size
+    scale = min(dst_w / src_w, dst_h / src_h)
+    width = max(1, min(dst_w, round(src_w * scale)))
+    height = max(1, min(dst_h, round(src_h * scale)))
+    return (dst_w - width) // 2, (dst_h - height) // 2, width, height
+
+
+class DisplaySurface:
+    """One RGB frame of `size` (width, height): `array` for drawing, `image` for PhotoImage.paste()."""
+
+    def __init__(self, size):
+        width, height = size
+        self.array = np.zeros((height, width, 3), dtype=np.uint8)
+        self.image = Image.new("RGB", size)
+
+    def commit(self):
+        """Copy `array` into `image` (decoded straight into the image's own memory)."""
+        self.image.frombytes(self.array)
+
+
+class DisplayRenderer:
+    """Letterboxes frames into DisplaySurfaces of `size` and draws the landmarks on top."""
+
+    def __init__(self, size):
+        self.size = size
+        self._source_shape = None
+        self._rect = None
+        self._scaled = None
+        self._interpolation = cv2.INTER_AREA
+        self._pixel_scale = np.zeros(2, dtype=np.float32)
+        self._pixel_offset = np.zeros(2, dtype=np.float32)
+        self._pixels = np.zeros((MAX_HANDS, NUM_LANDMARKS, 2), dtype=np.float32)
+        self._int_pixels = np.zeros(self._pixels.shape, dtype=np.int32)
+
+    def new_surface(self):
+        return DisplaySurface(self.size)
+
+    def _fit(self, shape):
+        # Geometry and the scaled-frame buffer only change with the camera resolution
+        height, width = shape[:2]
+        x, y, w, h = self._rect = letterbox_rect((width, height), self.size)
+        self._scaled = np.empty((h, w, 3), dtype=np.uint8)
+        self._interpolation = cv2.INTER_AREA if w < width else cv2.INTER_LINEAR
+        self._pixel_scale[:] = (w, h)
+        self._pixel_offset[:] = (x, y)
+        self._source_shape = shape
+
+    def render(self, rgb, points, surface):
+        """Scale `rgb` into `surface` and draw `points` ((n_hands, 21, 3) normalized, or None)."""
+        if rgb.shape != self._source_shape:
+            self._fit(rgb.shape)
+        x, y, w, h = self._rect
+        out = surface.array
+        cv2.resize(rgb, (w, h), dst=self._scaled, interpolation=self._interpolation)
+        out[y:y + h, x:x + w] = self._scaled
+        # Letterbox bars; surfaces rotate, so clear them on every frame
+        out[:y] = 0
+        out[y + h:] = 0
+        out[y:y + h, :x] = 0
+        out[y:y + h, x + w:] = 0
+        if points is not None:
+            self.draw_hands(out, points)
+        surface.commit()
+        return surface
+
+    def draw_hands(self, out, points):
+        n_hands = min(len(points), MAX_HANDS)
+        pixels = self._pixels[:n_hands]
+        np.multiply(points[:n_hands, :, :2], self._pixel_scale, out=pixels)
+        np.add(pixels, self._pixel_offset, out=pixels)
+        self._int_pixels[:n_hands] = pixels
+        for hand in self._int_pixels[:n_hands].tolist():
+            hand = [tuple(point) for point in hand]
+            for a, b in SKELETAL_CONNECTIONS:
+                cv2.line(out, hand[a], hand[b], CONNECTION_COLOR, THICKNESS)
+            for point in hand:
+                cv2.circle(out, point, LANDMARK_RADIUS, LANDMARK_COLOR, THICKNESS)
@@ -0,0 +1,445 @@
+"""
+GUI-free gesture monitoring engine.
+
+GestureEngine owns the camera, the MediaPipe Hands model, the capture/inference
+pipeline and the gesture -> action logic. Front ends (the CustomTkinter App,
+the headless console runner, test harnesses) subscribe to its events:
+
+    started()                           engine is running
+    frame(packet)                       inferred frame, only when subscribed
+    hands(points, handedness, packet)   hands found, no gesture
+    no_hands(packet)                    nothing in frame
+    gesture(name, packet)               gesture fired (its actions are dispatched, see actions.py)
+    log(message)                        human readable event log line
+    status(text, color)                 status panel text
+    stopped()                           engine has stopped
+
+Every frame carries its monotonic capture timestamp; the capture -> inference
+-> decision -> dispatch intervals are kept in `latency` (see metrics.py) and
+dumped when the engine stops or when dump_latency() is called.
+
+Callbacks are invoked on the engine's worker threads; GUI subscribers must
+marshal to their own thread.
+"""
+import sys
+import threading
+import time
+import traceback
+
+import cv2
+import numpy as np
+
+from actions import ActionRegistry, DryRunAction, ShellAction
+from buffers import FrameRing
+from capture import describe_settings, open_source
+from pipeline import FramePipeline, FramePacket
+from inference import AdaptiveInference, LatencyBudgetController, MotionGate
+from metrics import LatencyRecorder
+from recording import LandmarkRecorder, handedness_scores
+from shm_inference import RemoteHands
+from gestures import decide_gesture, hand_count, landmarks_to_array, handedness_codes
+from startup import profiler
+from templates import TemplateRecognizer
+
+EVENTS = ("started", "frame", "hands", "no_hands", "gesture", "log", "status", "stopped")
+
+
+def get_shutdown_command():
+    platform = sys.platform
+    if platform.startswith("win"):
+        return 'shutdown /s /t 1'
+    elif platform.startswith("linux"):
+        return 'shutdown -h now'
+    elif platform == "darwin":
+        return 'osascript -e \'tell app "System Events" to shut down\''
+    else:
+        return None
+
+
+def create_inference(hands, roi=False, latency_budget_ms=None, input_scale=1.0, crop_hands=None):
+    """
+    An AdaptiveInference around `hands` when ROI, a latency budget or a reduced
+    input scale is wanted, else None. ROI needs `crop_hands`, a
+    static_image_mode Hands for the crops.
+    """
+    if not (roi or latency_budget_ms or input_scale < 1.0):
+        return None
+    # ROI crops and/or a scaled-down input, landmarks mapped back to the full frame
+    controller = None
+    if latency_budget_ms:
+        controller = LatencyBudgetController(latency_budget_ms, max_scale=input_scale)
+    return AdaptiveInference(hands, roi=roi, controller=controller, scale=input_scale, crop_hands=crop_hands)
+
+
+def create_hands(max_num_hands=1, min_detection_confidence=0.8, min_tracking_confidence=0.6,
+                 model_complexity=1, static_image_mode=False):
+    with profiler.span("import mediapipe"):
+        import mediapipe as mp  # Deferred: by far the slowest import of the app
+    return mp.solutions.hands.Hands(
+        static_image_mode=static_image_mode,
+        max_num_hands=max_num_hands,
+        min_detection_confidence=min_detection_confidence,  # Higher for sensitivity
+        min_tracking_confidence=min_tracking_confidence,
+        model_complexity=model_complexity,  # 0 = lite landmark model, 1 = full
+    )
+
+
+class GestureEngine:
+    def __init__(self, camera_index=0, source=None, max_num_hands=1, min_detection_confidence=0.8,
+                 min_tracking_confidence=0.6, log_interval=2, roi=False, latency_budget_ms=None,
+                 motion_gate=False, max_skip_frames=5, latency_report_path=None,
+                 inference_process=False, dry_run_actions=False, record_path=None,
+                 model_complexity=1, input_scale=1.0, capture_options=None, template_library=None):
+        self.camera_index = camera_index
+        self.source = source  # capture.open_source() spec, overrides camera_index
+        self.capture_options = capture_options  # capture.CameraSource settings for cameras
+        self.max_num_hands = max_num_hands
+        self.min_detection_confidence = min_detection_confidence
+        self.min_tracking_confidence = min_tracking_confidence
+        self.model_complexity = model_complexity
+        self.input_scale = input_scale  # Model input size relative to the camera frame
+        self.log_interval = log_interval
+        self.roi = roi
+        self.latency_budget_ms = latency_budget_ms
+        # Static scenes reuse the last result for at most max_skip_frames frames in a row
+        self.motion_gate = MotionGate(max_skip_frames) if motion_gate else None
+        self.latency = LatencyRecorder()
+        self.latency_report_path = latency_report_path
+        # Run MediaPipe in a child process fed through a shared-memory ring
+        self.inference_process = inference_process
+        # Gesture -> actions, run on a thread pool so a slow action never blocks a stage
+        self.actions = ActionRegistry(log=self.log)
+        self.dry_run_actions = dry_run_actions
+        self._stopping_bindings = set()
+        # Every decided frame is appended here while running (see recording.py)
+        self.record_path = record_path
+        self.recorder = None
+        # Operator-recorded gestures, checked after the built-in rule (see templates.py)
+        self.template_library = template_library
+        self.templates = TemplateRecognizer(template_library, log=self.log) if template_library else None
+
+        self.hands = None
+        self.crop_hands = None  # Static-image model for ROI crops
+        self.inference = None
+        self.last_results = None
+        self.cap = None
+        self.pipeline = None
+        self.running = False
+        self.gesture_detected = {}  # stream -> gesture already fired for the current pose
+        self.captured_frames = 0
+        # Reused frame buffers: camera frame, mirrored BGR and RGB (see buffers.py)
+        self._raw_frame = None
+        self._frames = FrameRing()
+        self._rgb_frames = FrameRing()
+        # Decision counters for the metrics endpoint (see exporter.py)
+        self.decided_frames = 0
+        self.hand_frames = 0
+        self.gesture_counts = {}  # gesture name -> times fired
+        self.last_hand_log = 0
+        self.last_no_hand_log = 0
+        self._stopped = threading.Event()
+        self._subscribers = {event: [] for event in EVENTS}
+        self.bind_default_actions()
+
+    # --- EVENTS ---
+    def subscribe(self, event, callback):
+        if event not in self._subscribers:
+            raise ValueError(f"Unknown engine event: {event}")
+        self._subscribers[event].append(callback)
+        return callback
+
+    def unsubscribe(self, event, callback):
+        if callback in self._subscribers.get(event, ()):
+            self._subscribers[event].remove(callback)
+
+    def emit(self, event, *args):
+        for callback in list(self._subscribers[event]):
+            try:
+                callback(*args)
+            except Exception:
+                # A broken subscriber must never take down a pipeline stage
+                traceback.print_exc()
+
+    def log(self, message):
+        self.emit("log", message)
+
+    def set_status(self, text, color="#3b82f6"):
+        self.emit("status", text, color)
+
+    # --- LIFECYCLE ---
+    def open(self):
+        """
+        Build the Hands graph and open the camera, then run one warm-up
+        inference. Returns False on failure.
+        """
+        # The camera driver and the graph build are both slow and independent
+        camera_thread = threading.Thread(target=self.open_camera, name="camera-open", daemon=True)
+        camera_thread.start()
+        with profiler.span("build Hands graph"):
+            self.hands = self.create_model()
+            if self.roi:
+                self.crop_hands = self.create_model(static_image_mode=True)
+        self.inference = create_inference(self.hands, self.roi, self.latency_budget_ms, self.input_scale,
+                                          self.crop_hands)
+        camera_thread.join()
+        if self.cap is None or not self.cap.isOpened():
+            self.log("ERROR: Could not open camera.")
+            self.set_status("Camera Error", "#FF0000")
+            return False
+        if hasattr(self.cap, "settings"):
+            self.log(f"Capture {describe_settings(self.cap.settings())}")
+        self.warm_up()
+        return True
+
+    def create_model(self, static_image_mode=False):
+        options = (self.max_num_hands, self.min_detection_confidence, self.min_tracking_confidence,
+                   self.model_complexity, static_image_mode)
+        return RemoteHands(*options) if self.inference_process else create_hands(*options)
+
+    def open_camera(self):
+        with profiler.span("open camera"):
+            spec = self.source if self.source is not None else self.camera_index
+            self.cap = open_source(spec, camera_options=self.capture_options)
+
+    def warm_up(self):
+        """One inference on a real (or blank) frame so the first monitored frame is not the slow one."""
+        with profiler.span("warm-up inference"):
+            success, image = self.cap.read()
+            if not success:
+                # The negotiated size, so an out-of-process ring is sized for real frames
+                settings = self.cap.settings() if hasattr(self.cap, "settings") else {}
+                image = np.zeros((settings.get("height") or 480, settings.get("width") or 640, 3), dtype=np.uint8)
+            rgb = cv2.cvtColor(cv2.flip(image, 1), cv2.COLOR_BGR2RGB)
+            self.hands.process(rgb)
+            if self.crop_hands:
+                self.crop_hands.process(rgb)
+
+    def start(self):
+        if self.hands is None and not self.open():
+            return False
+
+        if self.record_path and self.recorder is None:
+            self.recorder = LandmarkRecorder(self.record_path)
+        if self.templates:
+            self.templates.preload()
+
+        # Presentation is only needed when somebody wants the frames
+        present = self.present_frame if self._subscribers["frame"] else None
+        self.pipeline = FramePipeline(self.capture_frame, self.infer_frame, present,
+                                      on_error=self.pipeline_failed)
+        self.running = True
+        self._stopped.clear()
+        self.pipeline.start()
+
+        self.log("AI Model and Camera Initialized - Instant Monitoring Active")
+        self.set_status("Instant Monitoring...", "#3b82f6")
+        profiler.mark("monitoring active")
+        self.emit("started")
+        return True
+
+    def stop(self):
+        if not self.running:
+            return
+        self.running = False
+        if self.pipeline:
+            self.pipeline.stop()
+        # Final state (either closed by user or due to shutdown)
+        self.set_status("Closed/Shutdown Initiated", "#FF00FF")
+        self.dump_latency()
+        self._stopped.set()
+        self.emit("stopped")
+
+    def pipeline_failed(self, stage_name, error):
+        """A stage raised: report it and stop monitoring instead of hanging."""
+        traceback.print_exc()
+        self.log(f"ERROR: {stage_name} stage failed: {error!r}")
+        self.stop()
+        self.set_status(f"{stage_name.capitalize()} Error", "#FF0000")
+
+    def close(self, timeout=5.0):
+        self.stop()
+        # The stages may still be inside read() or process(): let them finish
+        # before the camera, the model and the recorder go away. Interpreter
+        # teardown with a daemon stage inside MediaPipe/OpenCV can abort.
+        if self.pipeline and not self.pipeline.join(timeout):
+            self.log(f"WARNING: Pipeline stages still running after {timeout:g} s, releasing anyway.")
+        self.actions.shutdown()
+        if self.recorder:
+            self.recorder.close()
+            self.log(f"Recorded {self.recorder.count} frames to {self.record_path}")
+            self.recorder = None
+        if self.cap and self.cap.isOpened():
+            self.cap.release()
+        if self.hands:
+            self.hands.close()
+            self.hands = None
+            self.inference = None
+        if self.crop_hands:
+            self.crop_hands.close()
+            self.crop_hands = None
+
+    def wait(self, timeout=None):
+        """Block until the engine stops. Returns True if it did."""
+        return self._stopped.wait(timeout)
+
+    def run_forever(self):
+        """Start and block until stopped or interrupted (headless mode)."""
+        if not self.start():
+            self.close()
+            return False
+        try:
+            while not self.wait(0.5):
+                pass
+        except KeyboardInterrupt:
+            self.log("Interrupted, stopping monitor.")
+        finally:
+            self.close()
+        return True
+
+    def stats(self):
+        return self.pipeline.stats() if self.pipeline else {}
+
+    def dump_latency(self, path=None):
+        """Write the latency histograms as JSON to `path` (or --latency-report), else log a summary."""
+        path = path or self.latency_report_path
+        if path:
+            try:
+                self.latency.dump(path)
+                self.log(f"Latency report written to {path}")
+            except OSError as e:
+                self.log(f"ERROR: Could not write latency report: {e}")
+            return
+        for name, summary in self.latency.report().items():
+            if summary["count"]:
+                self.log(f"Latency {name}: p50 {summary['p50_ms']} ms, p99 {summary['p99_ms']} ms, "
+                         f"max {summary['max_ms']} ms ({summary['count']} frames)")
+
+    def inference_stats(self):
+        """Input scale, ROI and motion-gate counters, or None for plain full-frame inference."""
+        stats = {}
+        if self.inference:
+            stats.update(self.inference.stats())
+        if self.motion_gate:
+            stats.update(self.motion_gate.stats())
+        if isinstance(self.hands, RemoteHands):
+            stats["inference_timeouts"] = self.hands.timeouts
+        return stats or None
+
+    # --- PIPELINE STAGES (each runs on its own thread, see pipeline.py) ---
+    def capture_frame(self):
+        success, image = self.cap.read(self._raw_frame)
+        if not success:
+            time.sleep(0.1)
+            return None
+        self._raw_frame = image
+
+        # Flip the image horizontally for a mirror effect
+        image = cv2.flip(image, 1, dst=self._frames.next(image.shape))
+        self.captured_frames += 1
+        # Cameras report when the frame was grabbed, not when it was decoded
+        return FramePacket(self.captured_frames, image, getattr(self.cap, "captured_at", None))
+
+    def infer_frame(self, packet):
+        packet.rgb = cv2.cvtColor(packet.image, cv2.COLOR_BGR2RGB, dst=self._rgb_frames.next(packet.image.shape))
+
+        # Process the image with MediaPipe
+        if self.last_results is not None and self.motion_gate and self.motion_gate.should_skip(packet.image):
+            results = self.last_results
+        elif self.inference:
+            results = self.inference.process(packet.rgb)
+        else:
+            results = self.hands.process(packet.rgb)
+        packet.results = self.last_results = results
+        packet.inferred_at = time.monotonic()
+        self.latency.record("capture_to_inference", packet.captured_at, packet.inferred_at)
+
+        gesture = None
+        if hand_count(results):
+            packet.points = landmarks_to_array(results)
+            packet.handedness = handedness_codes(results)
+            gesture = self.decide_gesture(packet.points, packet.handedness)
+        self.record_decision(packet)
+        return self.handle_decision(packet, gesture)
+
+    def decide_gesture(self, points, handedness):
+        """Gesture name for the hands in one frame, or None (see gestures.decide_gesture)."""
+        # --- INSTANT GESTURE CHECK: Middle finger only triggers its actions immediately ---
+        return decide_gesture(points, handedness, self.templates)
+
+    def handle_decision(self, packet, gesture):
+        """Emit the events and dispatch the actions for one decided frame."""
+        if self.recorder:
+            self.recorder.append(packet, gesture, handedness_scores(packet.results))
+        current_time = time.time()
+        self.decided_frames += 1
+        if packet.points is not None and len(packet.points):
+            self.hand_frames += 1
+            if gesture:
+                if self.gesture_detected.get(packet.stream) != gesture:
+                    self.gesture_detected[packet.stream] = gesture
+                    self.gesture_counts[gesture] = self.gesture_counts.get(gesture, 0) + 1
+                    label = gesture.replace("_", " ").upper()
+                    self.log(f"{label} GESTURE DETECTED: Dispatching its actions!")
+                    self.set_status(f"{label} TRIGGERED", "#ff0000")
+                    self.emit("gesture", gesture, packet)
+                    self.dispatch_actions(gesture, packet)
+                return packet
+            self.gesture_detected[packet.stream] = None
+            self.emit("hands", packet.points, packet.handedness, packet)
+
+            # Log hand detection periodically
+            if current_time - self.last_hand_log > self.log_interval:
+                self.log("Hand detected, tracking landmarks.")
+                self.last_hand_log = current_time
+        else:
+            self.emit("no_hands", packet)
+
+            # Log no hand periodically
+            if current_time - self.last_no_hand_log > self.log_interval:
+                self.log("No hand detected.")
+                self.last_no_hand_log = current_time
+
+        return packet
+
+    def record_decision(self, packet):
+        packet.decided_at = time.monotonic()
+        self.latency.record("inference_to_decision", packet.inferred_at, packet.decided_at)
+        self.latency.record("capture_to_decision", packet.captured_at, packet.decided_at)
+
+    def present_frame(self, packet):
+        self.emit("frame", packet)
+
+    # --- ACTIONS ---
+    def bind_action(self, gesture, action, timeout=10.0, cooldown=5.0, stop_engine=False):
+        """
+        Run `action` (see actions.py) whenever `gesture` fires. With
+        dry_run_actions the action is only logged. `stop_engine` stops
+        monitoring once the action has been dispatched.
+        """
+        if self.dry_run_actions:
+            action = DryRunAction(f"dry run ({action})")
+            stop_engine = False
+        binding = self.actions.register(gesture, action, timeout, cooldown)
+        if stop_engine:
+            self._stopping_bindings.add(binding)
+        return binding
+
+    def bind_default_actions(self):
+        # Middle finger -> system shutdown, then stop monitoring
+        shutdown_cmd = get_shutdown_command()
+        if shutdown_cmd:
+            self.bind_action("middle_finger", ShellAction(shutdown_cmd), stop_engine=True)
+        else:
+            self.log("ERROR: Unsupported platform for shutdown.")
+
+    def dispatch_actions(self, gesture, packet):
+        """Hand the gesture to the ActionRegistry; returns immediately."""
+        dispatched_at = time.monotonic()
+        self.latency.record("decision_to_dispatch", packet.decided_at, dispatched_at)
+        self.latency.record("capture_to_dispatch", packet.captured_at, dispatched_at)
+        context = {"stream": packet.stream, "frame": packet.index, "captured_at": packet.captured_at}
+        started = self.actions.dispatch(gesture, context)
+        if self._stopping_bindings.intersection(started):
+            self.set_status("SHUTDOWN INITIATED", "#ff0000")
+            self.stop()
+        return started
@@ -0,0 +1,121 @@
+"""
+Bounded event log with an asynchronous structured file sink.
+
+EventLog keeps the last `max_lines` formatted lines in a ring buffer and a
+second bounded buffer of lines the display has not picked up yet; producers on
+any thread call add(), the GUI drains the pending lines in batches on a timer.
+Memory is fixed however long the monitor runs. Every event is also handed to
+an optional JsonlFileSink, whose writer thread appends one JSON object per
+line to a size-rotated file, so producers never wait for the disk.
+"""
+import json
+import os
+import queue
+import threading
+import time
+from collections import deque
+
+
+class JsonlFileSink:
+    """Appends records as JSON lines on a background thread, rotating at `max_bytes`."""
+
+    _CLOSE = object()
+
+    def __init__(self, path, max_bytes=10 * 1024 * 1024, backups=5, max_pending=10000):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.dropped = 0  # Records lost because the writer fell max_pending behind
+        self._queue = queue.Queue(max_pending)
+        self._thread = threading.Thread(target=self._run, name="event-log-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, record):
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self, timeout=2.0):
+        try:
+            self._queue.put(self._CLOSE, timeout=timeout)
+        except queue.Full:
+            return
+        self._thread.join(timeout)
+
+    def _rotate(self, f):
+        f.close()
+        for i in range(self.backups - 1, 0, -1):
+            older = f"{self.path}.{i}"
+            if os.path.exists(older):
+                os.replace(older, f"{self.path}.{i + 1}")
+        if self.backups:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        return open(self.path, "a", encoding="utf-8")
+
+    def _run(self):
+        f = open(self.path, "a", encoding="utf-8")
+        try:
+            while True:
+                record = self._queue.get()
+                if record is self._CLOSE:
+                    break
+                f.write(json.dumps(record, default=str) + "\n")
+                if self._queue.empty():
+                    # Flush once per burst, not once per record
+                    f.flush()
+                    if f.tell() >= self.max_bytes:
+                        f = self._rotate(f)
+        finally:
+            f.close()
+
+
+class EventLog:
+    """Fixed-size, thread-safe log model for the GUI and the structured sink."""
+
+    def __init__(self, max_lines=500, sink=None):
+        self.max_lines = max_lines
+        self.sink = sink
+        self.lines = deque(maxlen=max_lines)
+        self.total = 0
+        self._pending = deque(maxlen=max_lines)
+        self._lock = threading.Lock()
+
+    def add(self, message, event="log", **fields):
+        """Record an event and return its display line. Safe from any thread."""
+        now = time.time()
+        line = f"[{time.strftime('%H:%M:%S', time.localtime(now))}] {message}"
+        with self._lock:
+            self.lines.append(line)
+            self._pending.append(line)
+            self.total += 1
+        if self.sink:
+            self.sink.write({"time": now, "event": event, "message": message, **fields})
+        return line
+
+    def drain(self):
+        """Lines added since the last drain (at most max_lines), oldest first."""
+        with self._lock:
+            lines = list(self._pending)
+            self._pending.clear()
+        return lines
+
+    def record(self, event, message, **fields):
+        """Send an event to the structured sink only, without a display line."""
+        if self.sink:
+            self.sink.write({"time": time.time(), "event": event, "message": message, **fields})
+
+    def attach(self, engine):
+        """Mirror the engine's log lines, status changes, gestures and start/stop here."""
+        engine.subscribe("log", self.add)
+        engine.subscribe("status", lambda text, color: self.record("status", text))
+        engine.subscribe("gesture", lambda name, packet: self.record(
+            "gesture", name, stream=packet.stream, frame=packet.index))
+        engine.subscribe("started", lambda: self.record("started", "engine started"))
+        engine.subscribe("stopped", lambda: self.record("stopped", "engine stopped"))
+
+    def close(self):
+        if self.sink:
+            self.sink.close()
@@ -0,0 +1,246 @@
+"""
+Prometheus metrics endpoint.
+
+MetricsServer serves the engine's counters in the Prometheus text format
+(version 0.0.4) from a background thread, over local TCP or a Unix socket:
+
+    python main.py --headless --metrics-port 9464
+    curl http://127.0.0.1:9464/metrics
+    python main.py --headless --metrics-socket /run/hand-gesture.sock
+    curl --unix-socket /run/hand-gesture.sock http://localhost/metrics
+
+Everything is read from the engine when a scrape arrives (stage counters,
+latency histograms, decision counters, RSS), so the frame path does no extra
+work. FPS gauges are averaged over at least RATE_WINDOW seconds between
+scrapes; counters are exposed as well, so rate() works on the server side.
+
+`python exporter.py URL_OR_SOCKET` scrapes an endpoint once and prints it.
+"""
+import http.client
+import os
+import socket
+import socketserver
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+PREFIX = "hand_gesture"
+RATE_WINDOW = 1.0  # Seconds
+# Histogram `le` bounds in seconds: 1 ms .. 5 s
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+def resident_memory_bytes():
+    """Current RSS of this process, or the peak RSS where only that is available."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def format_value(value):
+    # Integers exactly (counters grow past what %g shows), floats in full precision
+    return str(value) if isinstance(value, int) else repr(float(value))
+
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+               for value in labels.values())
+    return "{" + ",".join(f'{key}="{value}"' for key, value in zip(labels, escaped)) + "}"
+
+
+class RateMeter:
+    """Per-key rate of monotonically increasing counters, measured between reads."""
+
+    def __init__(self, window=RATE_WINDOW):
+        self.window = window
+        self._reference = {}  # key -> (time, value) the rate is measured from
+        self._rates = {}
+        self._lock = threading.Lock()
+
+    def update(self, key, value, now=None):
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            reference = self._reference.get(key)
+            if reference is None or value < reference[1]:
+                # First sample, or the counter was reset (engine restarted)
+                self._reference[key] = (now, value)
+                self._rates[key] = 0.0
+            elif now - reference[0] >= self.window:
+                self._rates[key] = (value - reference[1]) / (now - reference[0])
+                self._reference[key] = (now, value)
+            return self._rates[key]
+
+
+class MetricsCollector:
+    """Renders one engine's state as Prometheus text."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.rates = RateMeter()
+
+    def collect(self):
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            name = f"{PREFIX}_{name}" if not name.startswith("process_") else name
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for suffix, labels, value in samples:
+                lines.append(f"{name}{suffix}{format_labels(labels)} {format_value(value)}")
+
+        engine = self.engine
+        stats = engine.stats()
+        metric("frames_total", "counter", "Frames processed by each pipeline stage or stream.",
+               [("", {"stage": stage}, counters["processed"]) for stage, counters in stats.items()])
+        metric("frames_per_second", "gauge", "Frames processed per second by each stage or stream.",
+               [("", {"stage": stage}, self.rates.update(stage, counters["processed"]))
+                for stage, counters in stats.items()])
+        metric("frames_dropped_total", "counter", "Frames replaced by newer ones before a stage took them.",
+               [("", {"stage": stage}, counters["dropped"]) for stage, counters in stats.items()])
+        inference = engine.inference_stats() or {}
+        metric("frames_skipped_total", "counter", "Frames the motion gate answered with the last result.",
+               [("", {}, inference.get("skipped", 0))])
+        if "scale" in inference:
+            metric("inference_input_scale", "gauge", "Model input size relative to the camera frame.",
+                   [("", {}, inference["scale"])])
+
+        samples = []
+        for interval, histogram in engine.latency.histograms.items():
+            counts, count, total_us = histogram.cumulative([bound * 1e6 for bound in LATENCY_BUCKETS])
+            labels = {"interval": interval}
+            for bound, cumulative in zip(LATENCY_BUCKETS, counts):
+                samples.append(("_bucket", dict(labels, le=f"{bound:g}"), cumulative))
+            samples.append(("_bucket", dict(labels, le="+Inf"), count))
+            samples.append(("_sum", labels, total_us / 1e6))
+            samples.append(("_count", labels, count))
+        metric("latency_seconds", "histogram", "Frame path intervals, see metrics.TRIGGER_INTERVALS.", samples)
+
+        decided = engine.decided_frames
+        metric("decided_frames_total", "counter", "Frames that reached a gesture decision.", [("", {}, decided)])
+        metric("hand_frames_total", "counter", "Decided frames with at least one hand.",
+               [("", {}, engine.hand_frames)])
+        metric("hand_present_ratio", "gauge", "Share of decided frames with at least one hand.",
+               [("", {}, engine.hand_frames / decided if decided else 0.0)])
+        metric("gesture_triggers_total", "counter", "Times each gesture fired.",
+               [("", {"gesture": name}, count) for name, count in sorted(engine.gesture_counts.items())])
+        metric("running", "gauge", "1 while the engine is monitoring.", [("", {}, int(engine.running))])
+
+        rss = resident_memory_bytes()
+        if rss is not None:
+            metric("process_resident_memory_bytes", "gauge", "Resident memory size in bytes.", [("", {}, rss)])
+        return "\n".join(lines) + "\n"
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        try:
+            body = self.server.collector.collect().encode()
+        except Exception as e:
+            # A half-started engine must not crash the endpoint
+            self.send_error(500, str(e))
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def address_string(self):
+        # Unix sockets have no peer address
+        return self.client_address[0] if self.client_address else "unix"
+
+    def log_message(self, format, *args):
+        pass  # Scrapes every few seconds would flood the console
+
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def server_bind(self):
+        if os.path.exists(self.server_address):
+            os.remove(self.server_address)  # Stale socket from a previous run
+        super().server_bind()
+
+
+class MetricsServer:
+    """
+    Serves `engine`'s metrics on 127.0.0.1:`port` (or `host`), or on the Unix
+    socket `socket_path`, from a daemon thread.
+    """
+
+    def __init__(self, engine, port=None, host="127.0.0.1", socket_path=None):
+        if (port is None) == (socket_path is None):
+            raise ValueError("Give exactly one of port and socket_path")
+        self.socket_path = socket_path
+        if socket_path:
+            self._server = UnixHTTPServer(socket_path, MetricsHandler)
+            self.address = socket_path
+        else:
+            self._server = ThreadingHTTPServer((host, port), MetricsHandler)
+            self._server.daemon_threads = True
+            self.address = f"http://{host}:{self._server.server_address[1]}/metrics"
+        self._server.collector = MetricsCollector(engine)
+        self._thread = threading.Thread(target=self._server.serve_forever, name="metrics-server", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self.socket_path and os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path, timeout=5.0):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+def scrape(address, timeout=5.0):
+    """GET the metrics text from 'http://host:port[/metrics]' or a Unix socket path."""
+    if address.startswith("http://"):
+        host_port, _, path = address[len("http://"):].partition("/")
+        connection = http.client.HTTPConnection(host_port, timeout=timeout)
+        path = "/" + (path or "metrics")
+    else:
+        connection = UnixHTTPConnection(address, timeout)
+        path = "/metrics"
+    try:
+        connection.request("GET", path)
+        response = connection.getresponse()
+        body = response.read().decode()
+        if response.status != 200:
+            raise RuntimeError(f"{address}: HTTP {response.status} {response.reason}")
+        return body
+    finally:
+        connection.close()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        sys.exit("usage: python exporter.py http://127.0.0.1:PORT/metrics | SOCKET_PATH")
+    sys.stdout.write(scrape(sys.argv[1]))
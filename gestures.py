@@ -0,0 +1,149 @@
+"""
+Vectorized gesture evaluation.
+
+MediaPipe results are converted once into contiguous float32 arrays of shape
+(n_hands, 21, 3); joint angles and finger states are then computed for all
+hands - or for a whole recorded batch of frames - in a single NumPy pass.
+Every function accepts any number of leading batch dimensions, so
+`points` may be (21, 3), (n_hands, 21, 3) or (n_frames, n_hands, 21, 3).
+"""
+import numpy as np
+
+NUM_LANDMARKS = 21
+
+# Joint triplets (a, b, c): the angle is measured at b between b->a and b->c.
+# Row 0 is the thumb fallback (CMC, MCP, TIP), rows 1-4 are MCP, PIP, TIP of
+# index, middle, ring and pinky.
+ANGLE_JOINTS = np.array([
+    (1, 2, 4),
+    (5, 6, 8),
+    (9, 10, 12),
+    (13, 14, 16),
+    (17, 18, 20),
+])
+EXTENDED_ANGLE = 140.0  # Degrees at the joint above which a finger counts as extended
+
+# Handedness codes used in place of MediaPipe's 'Left'/'Right' labels
+HAND_UNKNOWN = 0
+HAND_RIGHT = 1
+HAND_LEFT = -1
+
+THUMB, INDEX, MIDDLE, RING, PINKY = range(5)
+
+BUILTIN_GESTURE = "middle_finger"
+
+
+def hand_count(results):
+    """Number of hands in a MediaPipe result, without building protobufs for array-backed ones."""
+    if getattr(results, "points", None) is not None:
+        return len(results.points)
+    return len(results.multi_hand_landmarks or [])
+
+
+def landmarks_to_array(results):
+    """Return the hands in a MediaPipe result as a (n_hands, 21, 3) float32 array."""
+    if getattr(results, "points", None) is not None:
+        return results.points  # Already arrays, see shm_inference.ArrayResults
+    hands = results.multi_hand_landmarks or []
+    points = np.empty((len(hands), NUM_LANDMARKS, 3), dtype=np.float32)
+    for h, hand_landmarks in enumerate(hands):
+        for i, lm in enumerate(hand_landmarks.landmark):
+            points[h, i] = (lm.x, lm.y, lm.z)
+    return points
+
+
+def handedness_codes(results):
+    """Return one HAND_* code per detected hand as an int8 array."""
+    if getattr(results, "handedness", None) is not None:
+        return results.handedness
+    n_hands = len(results.multi_hand_landmarks or [])
+    codes = np.full(n_hands, HAND_UNKNOWN, dtype=np.int8)
+    for h, handedness in enumerate((results.multi_handedness or [])[:n_hands]):
+        label = handedness.classification[0].label  # 'Left' or 'Right'
+        if label:
+            codes[h] = HAND_RIGHT if label == "Right" else HAND_LEFT
+    return codes
+
+
+def joint_angles(points):
+    """Angles in degrees at the five ANGLE_JOINTS, shape (..., 5)."""
+    points = np.asarray(points, dtype=np.float64)
+    a = points[..., ANGLE_JOINTS[:, 0], :]
+    b = points[..., ANGLE_JOINTS[:, 1], :]
+    c = points[..., ANGLE_JOINTS[:, 2], :]
+    v1 = a - b
+    v2 = c - b
+    dot = np.einsum("...k,...k->...", v1, v2)
+    mags = np.linalg.norm(v1, axis=-1) * np.linalg.norm(v2, axis=-1)
+    valid = mags != 0
+    cos_angle = np.clip(np.divide(dot, mags, out=np.zeros_like(dot), where=valid), -1.0, 1.0)
+    # Degenerate joints (zero-length bone) count as 0 degrees, i.e. curled
+    return np.where(valid, np.degrees(np.arccos(cos_angle)), 0.0)
+
+
+def fingers_curled(points, handedness=HAND_UNKNOWN):
+    """
+    Return booleans (..., 5) for [thumb, index, middle, ring, pinky], True when
+    the finger is curled.
+
+    The thumb uses the tip-vs-IP x position for a known hand (image is
+    mirrored, so a right thumb points left) and falls back to the joint angle
+    when handedness is unknown; the other fingers are extended when the PIP
+    angle exceeds EXTENDED_ANGLE.
+    """
+    points = np.asarray(points)
+    handedness = np.broadcast_to(np.asarray(handedness, dtype=np.int8), points.shape[:-2])
+    extended = joint_angles(points) > EXTENDED_ANGLE
+
+    thumb_tip_x = points[..., 4, 0]
+    thumb_ip_x = points[..., 3, 0]
+    thumb_up = np.where(
+        handedness == HAND_RIGHT,
+        thumb_tip_x < thumb_ip_x,
+        np.where(handedness == HAND_LEFT, thumb_tip_x > thumb_ip_x, extended[..., THUMB]),
+    )
+    extended[..., THUMB] = thumb_up
+    return ~extended
+
+
+def is_middle_only_gesture(points, handedness=HAND_UNKNOWN):
+    """True where the middle finger is extended and every other finger is curled."""
+    curled = fingers_curled(points, handedness)
+    return (
+        curled[..., THUMB] & curled[..., INDEX] & ~curled[..., MIDDLE]
+        & curled[..., RING] & curled[..., PINKY]
+    )
+
+
+def decide_gesture(points, handedness, templates=None, present=None):
+    """
+    The gesture decision shared by the engine, stream workers, replays and
+    tuning: the built-in middle-finger rule first, then the first hand that
+    matches a template of `templates` (a templates.TemplateRecognizer).
+
+    For one frame ((n_hands, 21, 3) points) returns a name or None. For a
+    batch ((n_frames, n_hands, 21, 3), `present` (n_frames, n_hands) marking
+    the filled hand slots) returns an object array of names, the built-in rule
+    evaluated in one vectorized pass.
+    """
+    points = np.asarray(points)
+    handedness = np.asarray(handedness)
+    single = points.ndim == 3
+    if single:
+        points, handedness = points[None], handedness[None]
+    if present is None:
+        present = np.ones(points.shape[:2], dtype=bool)
+    builtin = (is_middle_only_gesture(points, handedness) & present).any(axis=1)
+    names = np.full(len(points), None, dtype=object)
+    names[builtin] = BUILTIN_GESTURE
+
+    if templates is not None:
+        pending = present & ~builtin[:, None]
+        if pending.any():
+            frames = np.nonzero(pending)[0]
+            matches = templates.library.classify(points[pending], handedness[pending])
+            # Reversed, so the first matching hand of a frame is the one that sticks
+            for frame, name in zip(frames[::-1].tolist(), matches[::-1]):
+                if name:
+                    names[frame] = name
+    return names[0] if single else names
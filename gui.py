@@ -0,0 +1,237 @@
+"""
+CustomTkinter front end.
+
+Importing this module pulls in CustomTkinter and Pillow only; OpenCV and
+MediaPipe are imported by the engine factory on a background thread once the
+window is on screen (see App.init_hands_and_camera).
+"""
+import threading
+import time
+import tkinter as tk  # For Canvas
+
+import customtkinter as ctk
+
+from eventlog import EventLog
+from presenter import FramePresenter
+from startup import profiler
+from virtual_hand import HandAnimator, VirtualHandRenderer
+
+# Set CustomTkinter appearance
+ctk.set_appearance_mode("dark")
+ctk.set_default_color_theme("blue")
+
+VIDEO_SIZE = (500, 600)  # Video label size
+LOG_FLUSH_MS = 250  # Pending log lines are written to the textbox in one batch this often
+
+
+class App(ctk.CTk):
+    def __init__(self, engine_factory, display_fps=30, event_log=None, wireframe_fps=60):
+        super().__init__()
+        # Bounded log model; the textbox never holds more than event_log.max_lines lines
+        self.event_log = event_log or EventLog()
+        # The engine (cv2, MediaPipe) is imported and built off the main thread
+        self.engine_factory = engine_factory
+        self.engine = None
+        self.closing = False
+        self.display = None  # display.DisplayRenderer, imported with the engine
+        self.title("Hand Gesture Monitor")
+        self.iconbitmap('icon.ico')  # Set custom icon
+        self.lift()  # Bring to foreground
+        self.focus_force()  # Force focus
+        self.attributes("-fullscreen", True)
+        self.resizable(True, True)  # Allow resizing for full-screen toggle
+        self.bind("<F11>", self.toggle_fullscreen)
+        self.bind("<Escape>", lambda e: self.attributes("-fullscreen", False))
+
+        # Header
+        self.header_label = ctk.CTkLabel(self, text="Real-Time Hand Gesture Monitor", font=ctk.CTkFont(size=28, weight="bold"), text_color="#ef4444")
+        self.header_label.pack(pady=20)
+
+        # Safety note
+        self.safety_label = ctk.CTkLabel(self, text="System monitoring active. All features are safety-enabled.", font=ctk.CTkFont(size=12), text_color="#fbbf24")
+        self.safety_label.pack(pady=(0, 20))
+
+        # Main frame
+        self.main_frame = ctk.CTkFrame(self)
+        self.main_frame.pack(fill="both", expand=True, padx=20, pady=10)
+
+        # Video frame
+        self.video_frame = ctk.CTkFrame(self.main_frame, width=500, height=600, fg_color="#1f2937", border_width=2, border_color="#374151")
+        self.video_frame.pack(side="left", padx=5, pady=10)
+        self.video_frame.pack_propagate(False)
+        self.video_label = ctk.CTkLabel(self.video_frame, text="Camera Feed Loading...")
+        self.video_label.pack(expand=True)
+        # Frames are rendered on the presentation thread and shown from here at display_fps
+        self.presenter = FramePresenter(self.video_label, VIDEO_SIZE, display_fps, self.on_presented)
+
+        # Virtual hand frame
+        self.virtual_frame = ctk.CTkFrame(self.main_frame, width=400, height=600, fg_color="#000000", border_width=2, border_color="#00FFFF")
+        self.virtual_frame.pack(side="left", padx=5, pady=10)
+        self.virtual_frame.pack_propagate(False)
+        self.virtual_canvas = tk.Canvas(self.virtual_frame, width=380, height=580, bg="#000000", highlightthickness=0)
+        self.virtual_canvas.pack(expand=True, padx=10, pady=10)
+        self.virtual_hand = VirtualHandRenderer(self.virtual_canvas)
+        # Interpolated between inference results and redrawn at wireframe_fps
+        self.hand_animator = HandAnimator(self.virtual_hand, wireframe_fps)
+        self.virtual_label = ctk.CTkLabel(self.virtual_frame, text="Holographic Wireframe Model", font=ctk.CTkFont(size=14, weight="bold"), text_color="#00FFFF")
+        self.virtual_label.pack(pady=(0, 10))
+
+        # Right panel
+        self.right_frame = ctk.CTkFrame(self.main_frame)
+        self.right_frame.pack(side="right", fill="both", expand=True, padx=5, pady=10)
+
+        # Status frame
+        self.status_frame = ctk.CTkFrame(self.right_frame, fg_color="#1f2937", border_width=2, border_color="#3b82f6")
+        self.status_frame.pack(fill="x", pady=10)
+        
+        # Status icon
+        self.status_icon = ctk.CTkLabel(self.status_frame, text="●", font=ctk.CTkFont(size=24, weight="bold"), text_color="#3b82f6")
+        self.status_icon.pack(pady=10)
+        
+        self.status_label = ctk.CTkLabel(self.status_frame, text="Loading AI Model...", font=ctk.CTkFont(size=20, weight="bold"), text_color="#3b82f6")
+        self.status_label.pack(pady=5)
+        self.fps_label = ctk.CTkLabel(self.status_frame, text="0 FPS", font=ctk.CTkFont(size=14), text_color="#6b7280")
+        self.fps_label.pack(pady=(0, 10))
+
+        # Log frame
+        self.log_frame = ctk.CTkFrame(self.right_frame, border_width=1, border_color="#374151")
+        self.log_frame.pack(fill="both", expand=True, pady=10)
+        self.log_label = ctk.CTkLabel(self.log_frame, text="Event Log", font=ctk.CTkFont(size=18, weight="bold"))
+        self.log_label.pack(pady=10)
+        self.log_textbox = ctk.CTkTextbox(self.log_frame, wrap="word", height=300)
+        self.log_textbox.pack(fill="both", expand=True, padx=10, pady=5)
+        self.log_textbox.insert("0.0", "[Starting] Waiting for AI model and camera to initialize...\n")
+
+        # Variables
+        self.last_fps_time = time.time()
+        self.frame_count = 0
+
+        # Status note (repurposed from countdown)
+        self.countdown_label = ctk.CTkLabel(self.status_frame, text="Instant Mode: Middle Finger = Immediate Shutdown", font=ctk.CTkFont(size=12), text_color="#ff4444")
+        self.countdown_label.pack(pady=5)
+
+        # Start the heavy init in the background as soon as the window is up
+        self.after_idle(self.start_init_thread)
+
+        # Bind close event
+        self.protocol("WM_DELETE_WINDOW", self.on_closing)
+        self.presenter.start()
+        self.hand_animator.start()
+
+        # Initial log
+        self.log("Application started successfully.")
+        self.flush_log()
+
+    def log(self, message):
+        # Safe from any thread; shown on the next flush_log()
+        self.event_log.add(message)
+
+    def flush_log(self):
+        lines = self.event_log.drain()
+        if lines:
+            textbox = self.log_textbox
+            textbox.insert("end", "\n".join(lines) + "\n")
+            # Keep the widget bounded: drop the oldest lines beyond max_lines
+            excess = int(textbox.index("end-1c").split(".")[0]) - 1 - self.event_log.max_lines
+            if excess > 0:
+                textbox.delete("1.0", f"{excess + 1}.0")
+            textbox.see("end")
+        self.after(LOG_FLUSH_MS, self.flush_log)
+
+    def update_status(self, text, color="#3b82f6"):
+        self.status_label.configure(text=text, text_color=color)
+
+    def toggle_fullscreen(self, event=None):
+        self.attributes("-fullscreen", not self.attributes("-fullscreen"))
+
+    def start_init_thread(self):
+        profiler.mark("window shown")
+        threading.Thread(target=self.init_hands_and_camera, name="engine-init", daemon=True).start()
+
+    def init_hands_and_camera(self):
+        # Background thread: imports, Hands graph, camera and warm-up never block the window
+        with profiler.span("import engine (cv2, numpy)"):
+            engine = self.engine_factory()
+        self.event_log.attach(engine)
+        engine.subscribe("status", self.on_engine_status)
+        engine.subscribe("started", self.on_engine_started)
+        engine.subscribe("hands", self.on_hands)
+        engine.subscribe("no_hands", self.on_no_hands)
+        engine.subscribe("frame", self.render_frame)
+        if not engine.open():
+            self.engine = engine
+            return
+        with profiler.span("import display renderer"):
+            from display import DisplayRenderer
+            self.display = DisplayRenderer(VIDEO_SIZE)
+        self.engine = engine
+        if self.closing:
+            engine.close()
+            return
+        # The engine starts its own capture/inference threads
+        engine.start()
+
+    # --- ENGINE EVENTS (called on engine threads, marshalled to Tk by the presenter) ---
+    def on_engine_status(self, text, color):
+        self.presenter.call_soon(self.update_status, text, color)
+
+    def on_engine_started(self):
+        # Print the startup timeline at the first shown frame, or shortly after
+        # start for engines without a video feed
+        self.presenter.call_soon(self.after, 2000, profiler.report)
+
+    def on_hands(self, points, handedness, packet):
+        # Every pose goes to the animator; it draws on the main thread at its own rate
+        self.hand_animator.push(points[0], packet.captured_at)
+
+    def on_no_hands(self, packet):
+        # Hidden at the animator's next tick
+        self.hand_animator.lose()
+
+    def render_frame(self, packet):
+        # Presentation thread: scale and draw here, never touch Tk widgets.
+        # Letterboxed into a reused surface, landmarks drawn at display size
+        buffer = self.presenter.buffer
+        surface = buffer.back(self.display.new_surface)
+        self.display.render(packet.rgb, packet.points, surface)
+        buffer.publish(surface)
+
+    def on_presented(self):
+        # Main thread, after the newest frame was pasted into the video label
+        # Update status to Monitoring after first frame
+        if self.status_label.cget("text") == "Loading AI Model...":
+            self.update_status("Monitoring...", "#3b82f6")
+            self.status_icon.configure(text_color="#3b82f6", text="●")
+        if self.presenter.shown == 1:
+            profiler.mark("first frame shown")
+            profiler.report()
+
+        # Update FPS (frames actually shown) and report frames dropped by each stage
+        self.frame_count += 1
+        current_time = time.time()
+        if current_time - self.last_fps_time >= 1:
+            fps = self.frame_count / (current_time - self.last_fps_time)
+            stats = self.engine.stats()
+            dropped = sum(stage["dropped"] for stage in stats.values())
+            text = f"{int(fps)} FPS | {dropped} dropped"
+            inference = self.engine.inference_stats()
+            if inference and "scale" in inference:
+                text += f" | input x{inference['scale']:.2f}"
+            if inference and "skipped" in inference:
+                text += f" | {inference['skipped']} skipped"
+            self.fps_label.configure(text=text)
+            self.frame_count = 0
+            self.last_fps_time = current_time
+
+    def check_cancel_gesture(self):
+        # Removed: No countdown, instant trigger only
+        pass
+
+    def on_closing(self):
+        self.closing = True
+        self.presenter.stop()
+        self.hand_animator.stop()
+        if self.engine:
+            self.engine.close()
+        self.event_log.close()
+        self.destroy()
@@ -0,0 +1,227 @@
+"""
+ROI-cropped, adaptive-resolution hand inference.
+
+AdaptiveInference wraps a MediaPipe Hands instance. While a hand is tracked it
+runs a second, static-image Hands on a padded crop around the previous frame's
+landmarks instead of the whole camera frame; when tracking is lost it falls
+back to the full frame. The crops get their own model because MediaPipe's video
+mode tracks the hand from the previous frame's coordinates, which are wrong
+whenever the input switches between crops of changing offset and size and the
+full frame. A LatencyBudgetController scales the model input down (or back up) so
+the measured per-frame inference time stays under a target budget. Landmarks
+are always mapped back to full-frame normalized coordinates, so gestures and
+drawing code see the same results as with a plain hands.process(rgb) call.
+
+MotionGate sits in front of either of them and lets static frames reuse the
+previous result instead of running the model at all.
+"""
+import time
+
+import cv2
+import numpy as np
+
+from gestures import hand_count, landmarks_to_array
+
+# A crop covering more than this fraction of the frame is not worth cropping
+MAX_ROI_AREA = 0.6
+
+
+def landmark_bbox(results):
+    """Normalized (x0, y0, x1, y1) around every detected landmark, or None."""
+    if not hand_count(results):
+        return None
+    xy = landmarks_to_array(results)[..., :2].reshape(-1, 2)
+    x0, y0 = xy.min(axis=0)
+    x1, y1 = xy.max(axis=0)
+    return float(x0), float(y0), float(x1), float(y1)
+
+
+def padded_roi(bbox, frame_width, frame_height, padding=0.6, min_size=96):
+    """
+    Pixel (x0, y0, x1, y1) of a square region around a normalized bbox, grown
+    by `padding` times its longer side on every edge and clamped to the frame.
+    """
+    x0, y0, x1, y1 = bbox
+    cx = (x0 + x1) / 2 * frame_width
+    cy = (y0 + y1) / 2 * frame_height
+    side = max((x1 - x0) * frame_width, (y1 - y0) * frame_height)
+    half = max(side * (1 + 2 * padding), min_size) / 2
+    left = int(max(0, cx - half))
+    top = int(max(0, cy - half))
+    right = int(min(frame_width, cx + half))
+    bottom = int(min(frame_height, cy + half))
+    if right - left < 2 or bottom - top < 2:
+        return None
+    return left, top, right, bottom
+
+
+def remap_landmarks(results, roi, frame_width, frame_height):
+    """Map landmarks found in a crop back to full-frame normalized coordinates, in place."""
+    left, top, right, bottom = roi
+    sx = (right - left) / frame_width
+    sy = (bottom - top) / frame_height
+    ox = left / frame_width
+    oy = top / frame_height
+    if hasattr(results, "remap"):
+        results.remap(ox, oy, sx, sy)  # Array-backed results, see shm_inference.py
+        return results
+    for hand in results.multi_hand_landmarks or []:
+        for lm in hand.landmark:
+            lm.x = ox + lm.x * sx
+            lm.y = oy + lm.y * sy
+            lm.z = lm.z * sx  # z uses roughly the same scale as x
+    return results
+
+
+class LatencyBudgetController:
+    """
+    Picks the model input scale. The smoothed inference time is compared with
+    `budget_ms`: over budget the scale shrinks, comfortably under it (below
+    `headroom` of the budget) the scale grows back towards `max_scale`.
+    """
+
+    def __init__(self, budget_ms, min_scale=0.3, max_scale=1.0, step=0.1,
+                 headroom=0.7, smoothing=0.3):
+        self.budget_ms = budget_ms
+        self.min_scale = min_scale
+        self.max_scale = max_scale
+        self.step = step
+        self.headroom = headroom
+        self.smoothing = smoothing
+        self.scale = max_scale
+        self.latency_ms = None
+
+    def update(self, latency_ms):
+        """Record one inference time and return the scale for the next frame."""
+        if self.latency_ms is None:
+            self.latency_ms = latency_ms
+        else:
+            self.latency_ms += self.smoothing * (latency_ms - self.latency_ms)
+        if self.latency_ms > self.budget_ms:
+            self.scale = max(self.min_scale, self.scale * (1 - self.step))
+        elif self.latency_ms < self.budget_ms * self.headroom:
+            self.scale = min(self.max_scale, self.scale * (1 + self.step / 2))
+        return self.scale
+
+
+class MotionGate:
+    """
+    Cheap change detector in front of inference. Frames are shrunk to a tiny
+    grayscale thumbnail and compared with the thumbnail of the last frame that
+    was actually inferred; when fewer than `min_changed` of the cells moved by
+    more than `pixel_threshold`, the frame can reuse the previous result. At
+    most `max_skip` frames in a row are skipped, which bounds the extra
+    trigger delay to max_skip frame intervals.
+    """
+
+    def __init__(self, max_skip=5, size=(64, 48), pixel_threshold=12, min_changed=0.002):
+        self.max_skip = max_skip
+        self.size = size
+        self.pixel_threshold = pixel_threshold
+        self.min_changed = min_changed
+        self.reference = None
+        self.consecutive = 0
+        self.skipped = 0
+        self.passed = 0
+        # Reused thumbnails: the colour one, and two grayscale ones taking turns as the reference
+        self._small = None
+        self._grays = [np.empty(size[::-1], dtype=np.uint8) for _ in range(2)]
+
+    def thumbnail(self, image):
+        if self._small is None or self._small.shape[2:] != image.shape[2:]:
+            self._small = np.empty(self.size[::-1] + image.shape[2:], dtype=image.dtype)
+        cv2.resize(image, self.size, dst=self._small, interpolation=cv2.INTER_AREA)
+        gray = self._grays[1] if self.reference is self._grays[0] else self._grays[0]
+        return cv2.cvtColor(self._small, cv2.COLOR_BGR2GRAY, dst=gray)
+
+    def should_skip(self, image):
+        """True when `image` (BGR) is close enough to the last inferred frame to skip it."""
+        thumb = self.thumbnail(image)
+        if self.reference is not None and self.consecutive < self.max_skip:
+            changed = np.count_nonzero(cv2.absdiff(thumb, self.reference) > self.pixel_threshold)
+            if changed < self.min_changed * thumb.size:
+                self.consecutive += 1
+                self.skipped += 1
+                return True
+        self.reference = thumb
+        self.consecutive = 0
+        self.passed += 1
+        return False
+
+    def stats(self):
+        return {"skipped": self.skipped, "inferred": self.passed}
+
+
+class AdaptiveInference:
+    """Drop-in replacement for hands.process(rgb) with ROI cropping and input scaling."""
+
+    def __init__(self, hands, roi=True, controller=None, padding=0.6, scale=1.0, crop_hands=None):
+        if roi and crop_hands is None:
+            raise ValueError("ROI inference needs a static_image_mode Hands for the crops (crop_hands)")
+        self.hands = hands  # Full frames only, so its video-mode tracking stays consistent
+        self.crop_hands = crop_hands
+        self.roi_enabled = roi
+        self.controller = controller
+        self.padding = padding
+        # Fixed input scale, or the controller's starting point
+        self.scale = controller.scale if controller else scale
+        self.last_bbox = None
+        self._scaled = None  # Reused model input for the downscaled full frame
+        self.roi_frames = 0
+        self.full_frames = 0
+        self.fallbacks = 0  # ROI lost the hand and the full frame was re-run
+
+    def _run(self, image, full_frame=False):
+        if self.scale < 1.0:
+            height, width = image.shape[:2]
+            size = (max(1, round(width * self.scale)), max(1, round(height * self.scale)))
+            dst = None
+            if full_frame:
+                # ROI crops change size every frame; only the full-frame input is reused
+                if self._scaled is None or self._scaled.shape[1::-1] != size:
+                    self._scaled = np.empty((size[1], size[0]) + image.shape[2:], dtype=image.dtype)
+                dst = self._scaled
+            image = cv2.resize(image, size, dst=dst, interpolation=cv2.INTER_AREA)
+        else:
+            image = np.ascontiguousarray(image)
+        return (self.hands if full_frame else self.crop_hands).process(image)
+
+    def process(self, rgb):
+        height, width = rgb.shape[:2]
+        start = time.perf_counter()
+
+        roi = None
+        if self.roi_enabled and self.last_bbox is not None:
+            roi = padded_roi(self.last_bbox, width, height, self.padding)
+            if roi and (roi[2] - roi[0]) * (roi[3] - roi[1]) > MAX_ROI_AREA * width * height:
+                roi = None
+
+        results = None
+        if roi is not None:
+            left, top, right, bottom = roi
+            results = self._run(rgb[top:bottom, left:right])
+            if hand_count(results):
+                remap_landmarks(results, roi, width, height)
+                self.roi_frames += 1
+            else:
+                # Tracking lost: look at the whole frame before giving up
+                self.fallbacks += 1
+                results = None
+        if results is None:
+            results = self._run(rgb, full_frame=True)
+            self.full_frames += 1
+
+        self.last_bbox = landmark_bbox(results)
+        if self.controller:
+            self.scale = self.controller.update((time.perf_counter() - start) * 1000)
+        return results
+
+    def stats(self):
+        return {
+            "scale": round(self.scale, 3),
+            "latency_ms": round(self.controller.latency_ms, 2)
+            if self.controller and self.controller.latency_ms is not None else None,
+            "roi_frames": self.roi_frames,
+            "full_frames": self.full_frames,
+            "fallbacks": self.fallbacks,
+        }
@@ -5,7 +5,11 @@ a = Analysis(
     ['main.py'],
     pathex=[],
     binaries=[],
-    datas=[('venv/Lib/site-packages/mediapipe/modules', 'mediapipe/modules')],
+    # Only the graphs and models the Hands solution loads, not all of mediapipe/modules
+    datas=[
+        ('venv/Lib/site-packages/mediapipe/modules/hand_landmark', 'mediapipe/modules/hand_landmark'),
+        ('venv/Lib/site-packages/mediapipe/modules/palm_detection', 'mediapipe/modules/palm_detection'),
+    ],
     hiddenimports=[],
     hookspath=[],
     hooksconfig={},
@@ -0,0 +1,138 @@
+"""
+In-memory latency histograms.
+
+LatencyHistogram is a small HDR-style histogram: microsecond values are
+counted in log-linear buckets (PRECISION_BITS of sub-bucket resolution per
+power of two, i.e. under 1% relative error) so recording is O(1), memory is
+fixed no matter how long the monitor runs, and percentiles can be read at any
+time. LatencyRecorder keeps one histogram per named interval of the frame path.
+"""
+import json
+import threading
+
+import numpy as np
+
+PRECISION_BITS = 7
+SUB_BUCKETS = 1 << PRECISION_BITS
+HALF_BUCKETS = SUB_BUCKETS // 2
+
+# Intervals of the trigger path, in the order a frame goes through them
+TRIGGER_INTERVALS = (
+    "capture_to_inference",   # camera frame read -> model result available
+    "inference_to_decision",  # model result -> gesture decision made
+    "decision_to_dispatch",   # gesture decision -> action started
+    "capture_to_decision",    # whole detection path, every frame
+    "capture_to_dispatch",    # whole trigger path, gesture frames only
+)
+
+
+def bucket_index(value):
+    """Bucket of a non-negative integer value."""
+    if value < SUB_BUCKETS:
+        return value
+    shift = value.bit_length() - PRECISION_BITS
+    return SUB_BUCKETS + (shift - 1) * HALF_BUCKETS + ((value >> shift) - HALF_BUCKETS)
+
+
+def bucket_value(index):
+    """Midpoint of the values counted in bucket `index`."""
+    if index < SUB_BUCKETS:
+        return float(index)
+    shift, offset = divmod(index - SUB_BUCKETS, HALF_BUCKETS)
+    shift += 1
+    low = (offset + HALF_BUCKETS) << shift
+    return low + ((1 << shift) - 1) / 2
+
+
+class LatencyHistogram:
+    """Log-linear histogram of durations in microseconds, up to `max_us`."""
+
+    def __init__(self, max_us=60_000_000):
+        self.max_us = max_us
+        self.counts = np.zeros(bucket_index(max_us) + 1, dtype=np.int64)
+        self.count = 0
+        self.total_us = 0
+        self.min_us = None
+        self.max_seen_us = 0
+        self._lock = threading.Lock()
+
+    def record(self, seconds):
+        value = min(max(int(seconds * 1e6), 0), self.max_us)
+        with self._lock:
+            self.counts[bucket_index(value)] += 1
+            self.count += 1
+            self.total_us += value
+            self.min_us = value if self.min_us is None else min(self.min_us, value)
+            self.max_seen_us = max(self.max_seen_us, value)
+
+    def percentile(self, q):
+        """Approximate q-th percentile (0-100) in microseconds, None when empty."""
+        with self._lock:
+            if not self.count:
+                return None
+            rank = max(1, int(np.ceil(q / 100 * self.count)))
+            index = int(np.searchsorted(np.cumsum(self.counts), rank))
+        return bucket_value(index)
+
+    def cumulative(self, bounds_us):
+        """
+        (counts at or below each bound, total count, total microseconds), e.g.
+        for Prometheus `le` buckets. A bound is resolved to its bucket, so
+        values just above it may be included (same <1% error as percentile()).
+        """
+        indices = [min(bucket_index(int(bound)), len(self.counts) - 1) for bound in bounds_us]
+        with self._lock:
+            cumsum = np.cumsum(self.counts)
+            return [int(cumsum[i]) for i in indices], self.count, self.total_us
+
+    def reset(self):
+        with self._lock:
+            self.counts[:] = 0
+            self.count = 0
+            self.total_us = 0
+            self.min_us = None
+            self.max_seen_us = 0
+
+    def summary(self):
+        """Count, mean, min/max and p50/p90/p99/p99.9 in milliseconds."""
+        if not self.count:
+            return {"count": 0}
+        summary = {
+            "count": self.count,
+            "mean_ms": round(self.total_us / self.count / 1000, 3),
+            "min_ms": round(self.min_us / 1000, 3),
+            "max_ms": round(self.max_seen_us / 1000, 3),
+        }
+        for q in (50, 90, 99, 99.9):
+            summary[f"p{q:g}_ms"] = round(self.percentile(q) / 1000, 3)
+        return summary
+
+
+class LatencyRecorder:
+    """One LatencyHistogram per interval name, created on first use."""
+
+    def __init__(self, intervals=TRIGGER_INTERVALS):
+        self.histograms = {name: LatencyHistogram() for name in intervals}
+        self._lock = threading.Lock()
+
+    def record(self, name, start, end):
+        """Record `end - start` (monotonic seconds); ignored if either is missing."""
+        if start is None or end is None:
+            return
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault(name, LatencyHistogram())
+        histogram.record(end - start)
+
+    def report(self):
+        return {name: histogram.summary() for name, histogram in self.histograms.items()}
+
+    def dump(self, path):
+        with open(path, "w") as f:
+            json.dump(self.report(), f, indent=2)
+            f.write("\n")
+
+    def reset(self):
+        for histogram in self.histograms.values():
+            histogram.reset()
@@ -0,0 +1,198 @@
+"""
+Staged capture -> inference -> presentation pipeline.
+
+Every stage runs on its own thread and hands frames to the next stage through
+a small DropOldestQueue. When a consumer falls behind, the oldest pending frame
+is thrown away (and counted) instead of blocking the producer, so inference
+always sees the newest camera frame and a slow display never delays detection.
+"""
+import threading
+import time
+import traceback
+from collections import deque
+
+
+class DropOldestQueue:
+    """Bounded FIFO that discards the oldest item instead of blocking on put()."""
+
+    def __init__(self, maxsize=1):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.dropped = 0
+        self._items = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+
+    def put(self, item):
+        with self._cond:
+            if len(self._items) >= self.maxsize:
+                self._items.popleft()
+                self.dropped += 1
+            self._items.append(item)
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        """Return the oldest pending item, or None on timeout / after close()."""
+        with self._cond:
+            if not self._items and not self._closed:
+                self._cond.wait(timeout)
+            if not self._items:
+                return None
+            return self._items.popleft()
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def __len__(self):
+        with self._cond:
+            return len(self._items)
+
+
+class FramePacket:
+    """One camera frame and everything later stages attach to it."""
+
+    __slots__ = ("index", "image", "captured_at", "inferred_at", "decided_at",
+                 "rgb", "results", "points", "handedness", "stream")
+
+    def __init__(self, index, image, captured_at=None, stream=0):
+        self.index = index
+        self.stream = stream  # capture source number, see streams.py
+        self.image = image  # BGR, already mirrored
+        self.captured_at = time.monotonic() if captured_at is None else captured_at
+        self.inferred_at = None  # time.monotonic() when the model result was available
+        self.decided_at = None  # time.monotonic() when the gesture decision was made
+        self.rgb = None
+        self.results = None
+        self.points = None  # (n_hands, 21, 3) float32, see gestures.landmarks_to_array
+        self.handedness = None
+
+
+class Stage(threading.Thread):
+    """
+    Runs `work(item)` for every item taken from `in_queue` and pushes non-None
+    results into `out_queue`. A stage without an input queue is a source and
+    calls `work()` with no argument in a loop. An exception from `work` ends
+    the stage and is passed to `on_error(stage, error)` (printed without one).
+    """
+
+    def __init__(self, name, work, in_queue=None, out_queue=None, poll_interval=0.1, on_error=None):
+        super().__init__(name=f"{name}-stage", daemon=True)
+        self.stage_name = name
+        self.work = work
+        self.in_queue = in_queue
+        self.out_queue = out_queue
+        self.poll_interval = poll_interval
+        self.on_error = on_error
+        self.error = None
+        self.processed = 0
+        self._stop_event = threading.Event()
+
+    @property
+    def dropped(self):
+        # Frames that were waiting for this stage but got replaced by newer ones
+        return self.in_queue.dropped if self.in_queue is not None else 0
+
+    def stop(self):
+        self._stop_event.set()
+
+    def stopped(self):
+        return self._stop_event.is_set()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            try:
+                self.step()
+            except Exception as e:
+                # Without this the thread would die silently and the other
+                # stages would wait forever on an empty queue
+                self.error = e
+                self._stop_event.set()
+                if self.on_error is None:
+                    traceback.print_exc()
+                else:
+                    self.on_error(self, e)
+                return
+
+    def step(self):
+        if self.in_queue is None:
+            result = self.work()
+            if result is None:
+                return
+        else:
+            item = self.in_queue.get(timeout=self.poll_interval)
+            if item is None:
+                return
+            result = self.work(item)
+        self.processed += 1
+        if result is not None and self.out_queue is not None:
+            self.out_queue.put(result)
+
+
+class FramePipeline:
+    """
+    Wires the capture, inference and (optional) presentation stages together.
+    Without a `present` callable the pipeline ends at inference, which is how
+    the headless engine runs. When any stage fails the whole pipeline stops
+    and `on_error(stage_name, error)` is called on the failed stage's thread.
+    """
+
+    def __init__(self, capture, infer, present=None, queue_size=1, on_error=None):
+        self.on_error = on_error
+        self.inference_queue = DropOldestQueue(queue_size)
+        self.presentation_queue = DropOldestQueue(queue_size) if present else None
+        self.stages = [
+            Stage("capture", capture, out_queue=self.inference_queue, on_error=self._stage_failed),
+            Stage("inference", infer, self.inference_queue, self.presentation_queue,
+                  on_error=self._stage_failed),
+        ]
+        if present:
+            self.stages.append(Stage("presentation", present, self.presentation_queue,
+                                     on_error=self._stage_failed))
+
+    def start(self):
+        for stage in self.stages:
+            stage.start()
+
+    def stop(self):
+        # Never joins: stop() is called from stage threads (a gesture that stops
+        # the engine, a failed stage). Use join() before releasing what the
+        # stages use.
+        for stage in self.stages:
+            stage.stop()
+        self.inference_queue.close()
+        if self.presentation_queue is not None:
+            self.presentation_queue.close()
+
+    def join(self, timeout=None):
+        """
+        Wait up to `timeout` seconds in total for the stages to finish; the
+        calling stage (if any) is skipped. Returns True when all have.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        current = threading.current_thread()
+        for stage in self.stages:
+            if stage is current or not stage.is_alive():
+                continue
+            stage.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+        return not any(stage.is_alive() for stage in self.stages if stage is not current)
+
+    def _stage_failed(self, stage, error):
+        self.stop()
+        if self.on_error is None:
+            traceback.print_exc()
+        else:
+            self.on_error(stage.stage_name, error)
+
+    @property
+    def running(self):
+        return any(stage.is_alive() and not stage.stopped() for stage in self.stages)
+
+    def stats(self):
+        """Per-stage processed/dropped counters, e.g. for the status panel."""
+        return {
+            stage.stage_name: {"processed": stage.processed, "dropped": stage.dropped}
+            for stage in self.stages
+        }
@@ -0,0 +1,131 @@
+"""
+Main-thread frame presentation.
+
+Worker threads never touch Tk. The presentation stage renders each frame into
+a reusable surface from a FrameBuffer and publishes it; a FramePresenter polls
+that buffer with after() on the Tk main thread at its own display rate, pastes
+only the newest finished frame into one persistent PhotoImage and runs any
+callbacks the workers queued with call_soon().
+"""
+import queue
+import threading
+import traceback
+
+from PIL import ImageTk
+
+
+class FrameBuffer:
+    """
+    Triple buffer of reusable frames between one writer thread and the Tk
+    main thread.
+
+    The writer renders into back() - a surface that is neither the published
+    front frame nor the one being pasted - and publish()es it. take() returns
+    the front frame once (then None until a newer one is published) and keeps
+    it away from the writer until done(). At most three surfaces are ever
+    created. Frames replaced before the display picked them up are counted in
+    `overwritten`.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._surfaces = []
+        self._front = None
+        self._reading = None
+        self._fresh = False
+        self.published = 0
+        self.overwritten = 0
+
+    def back(self, create):
+        """A surface free for writing; `create()` makes one when none is."""
+        with self._lock:
+            for surface in self._surfaces:
+                if surface is not self._front and surface is not self._reading:
+                    return surface
+            surface = create()
+            self._surfaces.append(surface)
+            return surface
+
+    def publish(self, frame):
+        with self._lock:
+            self._front = frame
+            if self._fresh:
+                self.overwritten += 1
+            self._fresh = True
+            self.published += 1
+
+    def take(self):
+        with self._lock:
+            if not self._fresh:
+                return None
+            self._fresh = False
+            self._reading = self._front
+            return self._front
+
+    def done(self):
+        """The frame from take() has been pasted and may be written again."""
+        with self._lock:
+            self._reading = None
+
+
+class FramePresenter:
+    """
+    Shows frames from a FrameBuffer in `label` at `fps`, independently of the
+    rate at which they are produced. Must be started from the Tk main thread.
+    """
+
+    def __init__(self, label, size, fps=30, on_present=None):
+        self.label = label
+        self.size = size
+        self.interval_ms = max(1, round(1000 / fps))
+        self.on_present = on_present
+        self.buffer = FrameBuffer()
+        self.photo = None
+        self.shown = 0
+        self._calls = queue.SimpleQueue()
+        self._after_id = None
+
+    def call_soon(self, callback, *args):
+        """Run `callback(*args)` on the Tk main thread at the next tick. Thread-safe."""
+        self._calls.put((callback, args))
+
+    def start(self):
+        if self._after_id is None:
+            self._tick()
+
+    def stop(self):
+        if self._after_id is not None:
+            self.label.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _tick(self):
+        self._run_calls()
+        frame = self.buffer.take()
+        if frame is not None:
+            try:
+                self._show(frame.image)
+            finally:
+                self.buffer.done()
+        self._after_id = self.label.after(self.interval_ms, self._tick)
+
+    def _run_calls(self):
+        while True:
+            try:
+                callback, args = self._calls.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                callback(*args)
+            except Exception:
+                traceback.print_exc()
+
+    def _show(self, image):
+        if self.photo is None:
+            # One PhotoImage for the lifetime of the label, updated in place
+            self.photo = ImageTk.PhotoImage("RGB", self.size)
+            self.label.configure(image=self.photo)
+            self.label.image = self.photo
+        self.photo.paste(image)
+        self.shown += 1
+        if self.on_present:
+            self.on_present()
@@ -0,0 +1,294 @@
+"""
+Compact landmark recordings.
+
+A recording is a fixed-record binary file: a 64 byte header followed by one
+RECORD_DTYPE record per inferred frame (capture timestamp, frame number,
+stream, hand count, gesture flag, handedness codes and scores, and the
+(MAX_HANDS, 21, 3) float32 landmarks). Next to it, `<path>.idx` holds one
+(captured_at, record number) pair per INDEX_INTERVAL seconds, so time ranges
+can be found without touching the big file.
+
+LandmarkRecording opens the file with numpy.memmap: hours of data can be
+sliced or streamed in chunks without being loaded. Records are in write
+order; with several streams (streams.py) their timestamps interleave, so time
+ranges of such recordings are found with a scan instead of the index. ReplaySource feeds it back
+into the gesture logic, paced at any speed or as fast as possible.
+
+    python recording.py info session.hglr
+    python recording.py replay session.hglr --speed 0
+"""
+import argparse
+import json
+import os
+import struct
+import sys
+import time
+
+import numpy as np
+
+from gestures import NUM_LANDMARKS, decide_gesture
+from pipeline import FramePacket
+
+MAGIC = b"HGLR"
+VERSION = 1
+HEADER_SIZE = 64
+HEADER_FORMAT = "<4sHHHH"  # magic, version, header size, record size, max hands
+MAX_HANDS = 2
+INDEX_INTERVAL = 1.0  # Seconds between index entries
+
+RECORD_DTYPE = np.dtype([
+    ("captured_at", "<f8"),  # time.monotonic() of the camera frame
+    ("frame", "<u4"),
+    ("stream", "<u2"),
+    ("n_hands", "u1"),
+    ("gesture", "u1"),  # 1 when the frame decided a gesture
+    ("handedness", "i1", (MAX_HANDS,)),  # gestures.HAND_* codes
+    ("scores", "<f4", (MAX_HANDS,)),  # handedness classification scores
+    ("points", "<f4", (MAX_HANDS, NUM_LANDMARKS, 3)),
+])
+INDEX_DTYPE = np.dtype([("captured_at", "<f8"), ("record", "<u8")])
+
+
+def handedness_scores(results):
+    """Classification score per detected hand (0 when unavailable), float32."""
+    if getattr(results, "points", None) is not None:
+        # Array-backed results (see shm_inference.py) carry no scores
+        return np.zeros(len(results.points), dtype=np.float32)
+    hands = (results.multi_handedness or []) if results is not None else []
+    return np.array([h.classification[0].score for h in hands], dtype=np.float32)
+
+
+class LandmarkRecorder:
+    """Appends one record per frame. Not thread-safe: call from one stage."""
+
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        self._record = np.zeros(1, dtype=RECORD_DTYPE)
+        self._next_index_at = None
+        self._file = open(path, "wb")
+        header = struct.pack(HEADER_FORMAT, MAGIC, VERSION, HEADER_SIZE, RECORD_DTYPE.itemsize, MAX_HANDS)
+        self._file.write(header.ljust(HEADER_SIZE, b"\0"))
+        self._index = open(path + ".idx", "wb")
+
+    def append(self, packet, gesture=None, scores=None):
+        """Write the decided FramePacket `packet` (points may be None for no hands)."""
+        record = self._record[0]
+        record["captured_at"] = packet.captured_at
+        record["frame"] = packet.index
+        record["stream"] = packet.stream
+        record["gesture"] = 1 if gesture else 0
+        record["handedness"] = 0
+        record["scores"] = 0
+        record["points"] = 0
+        n_hands = 0
+        if packet.points is not None:
+            n_hands = min(len(packet.points), MAX_HANDS)
+            record["points"][:n_hands] = packet.points[:n_hands]
+            record["handedness"][:n_hands] = packet.handedness[:n_hands]
+            if scores is not None:
+                record["scores"][:len(scores[:n_hands])] = scores[:n_hands]
+        record["n_hands"] = n_hands
+
+        if self._next_index_at is None or packet.captured_at >= self._next_index_at:
+            self._index.write(np.array([(packet.captured_at, self.count)], INDEX_DTYPE).tobytes())
+            self._next_index_at = packet.captured_at + INDEX_INTERVAL
+        self._file.write(self._record.tobytes())
+        self.count += 1
+
+    def close(self):
+        self._file.close()
+        self._index.close()
+
+
+class LandmarkRecording:
+    """Read-only, memory-mapped view of a recording."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            magic, version, header_size, record_size, max_hands = struct.unpack(
+                HEADER_FORMAT, f.read(struct.calcsize(HEADER_FORMAT)))
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a landmark recording")
+        if version != VERSION or record_size != RECORD_DTYPE.itemsize or max_hands != MAX_HANDS:
+            raise ValueError(f"{path}: unsupported recording layout (version {version})")
+        # A partly written last record (crash, power loss) is ignored
+        count = (os.path.getsize(path) - header_size) // record_size
+        self.records = np.memmap(path, dtype=RECORD_DTYPE, mode="r", offset=header_size, shape=(count,))
+        index_path = path + ".idx"
+        if os.path.exists(index_path) and os.path.getsize(index_path) >= INDEX_DTYPE.itemsize:
+            self.index = np.fromfile(index_path, dtype=INDEX_DTYPE)
+        else:
+            self.index = np.zeros(0, dtype=INDEX_DTYPE)
+        self._time_sorted = None
+
+    def __len__(self):
+        return len(self.records)
+
+    def __getitem__(self, key):
+        return self.records[key]
+
+    @property
+    def duration(self):
+        if not len(self.records):
+            return 0.0
+        times = self.records["captured_at"]
+        if not self.time_sorted:
+            return float(times.max() - times.min())
+        return float(times[-1] - times[0])
+
+    @property
+    def time_sorted(self):
+        """True when captured_at never decreases, which the index search relies on."""
+        if self._time_sorted is None:
+            self._time_sorted = True
+            previous = -np.inf
+            for chunk in self.chunks():
+                times = chunk["captured_at"]
+                if len(times) and (times[0] < previous or (np.diff(times) < 0).any()):
+                    self._time_sorted = False
+                    break
+                if len(times):
+                    previous = times[-1]
+        return self._time_sorted
+
+    def between(self, start, end):
+        """
+        Records captured in [start, end) seconds from the start of the
+        recording, in file order. Time-sorted recordings are sliced through
+        the index; interleaved ones (several streams) are filtered with a mask.
+        """
+        if not len(self.records):
+            return self.records
+        times = self.records["captured_at"]
+        if not self.time_sorted:
+            t0 = times.min()
+            return self.records[(times >= t0 + start) & (times < t0 + end)]
+        t0 = times[0]
+        first, last = self._locate(t0 + start), self._locate(t0 + end)
+        return self.records[first:last]
+
+    def _locate(self, captured_at):
+        # Narrow down with the index, then search only that stretch of the file
+        lo, hi = 0, len(self.records)
+        if len(self.index):
+            i = int(np.searchsorted(self.index["captured_at"], captured_at, side="right"))
+            if i > 0:
+                lo = int(self.index["record"][i - 1])
+            if i < len(self.index):
+                hi = int(self.index["record"][i])
+        stretch = self.records["captured_at"][lo:hi]
+        return lo + int(np.searchsorted(stretch, captured_at))
+
+    def chunks(self, size=65536):
+        """Stream the recording in slices of `size` records."""
+        for start in range(0, len(self.records), size):
+            yield self.records[start:start + size]
+
+    def evaluate(self, templates=None, chunk_size=65536):
+        """
+        Gesture name (or None) per record, decided like the live engine
+        (gestures.decide_gesture) chunk by chunk.
+        """
+        decisions = np.full(len(self.records), None, dtype=object)
+        for start, chunk in zip(range(0, len(self.records), chunk_size), self.chunks(chunk_size)):
+            present = np.arange(MAX_HANDS) < chunk["n_hands"][:, None]
+            decisions[start:start + len(chunk)] = decide_gesture(chunk["points"], chunk["handedness"],
+                                                                 templates, present)
+        return decisions
+
+
+class ReplaySource:
+    """
+    Yields a recording as decided FramePackets. `speed` 1.0 replays in real
+    time, 10 ten times faster, 0 as fast as possible.
+    """
+
+    def __init__(self, recording, speed=0.0):
+        self.recording = recording
+        self.speed = speed
+
+    def __iter__(self):
+        records = self.recording.records
+        if not len(records):
+            return
+        wall_start = time.monotonic()
+        t0 = float(records["captured_at"][0])
+        for chunk in self.recording.chunks(4096):
+            for record in chunk:
+                captured_at = float(record["captured_at"])
+                if self.speed:
+                    delay = (captured_at - t0) / self.speed - (time.monotonic() - wall_start)
+                    if delay > 0:
+                        time.sleep(delay)
+                packet = FramePacket(int(record["frame"]), None, captured_at, stream=int(record["stream"]))
+                n_hands = int(record["n_hands"])
+                if n_hands:
+                    packet.points = np.array(record["points"][:n_hands])
+                    packet.handedness = np.array(record["handedness"][:n_hands])
+                yield packet
+
+
+def replay_into(engine, recording, speed=0.0):
+    """Run a recording through engine.handle_decision(); returns the number of frames."""
+    frames = 0
+    for packet in ReplaySource(recording, speed):
+        gesture = engine.decide_gesture(packet.points, packet.handedness) if packet.points is not None else None
+        packet.inferred_at = packet.decided_at = packet.captured_at
+        engine.handle_decision(packet, gesture)
+        frames += 1
+    return frames
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect or replay landmark recordings")
+    sub = parser.add_subparsers(dest="command", required=True)
+    info = sub.add_parser("info", help="print a summary of a recording")
+    info.add_argument("path")
+    replay = sub.add_parser("replay", help="feed a recording through the gesture logic")
+    replay.add_argument("path")
+    replay.add_argument("--speed", type=float, default=0.0,
+                        help="1 = real time, 10 = ten times faster, 0 = as fast as possible (default)")
+    replay.add_argument("--templates", metavar="PATH",
+                        help="gesture template library (see templates.py), as with main.py --templates")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    recording = LandmarkRecording(args.path)
+    if args.command == "info":
+        records = recording.records
+        summary = {
+            "frames": len(recording),
+            "duration_s": round(recording.duration, 3),
+            "hand_present_ratio": round(float((records["n_hands"] > 0).mean()), 3) if len(records) else 0.0,
+            "gesture_frames": int(records["gesture"].sum()),
+            "streams": sorted(int(s) for s in np.unique(records["stream"])),
+        }
+    else:
+        from engine import GestureEngine
+
+        # Replays never run real actions
+        engine = GestureEngine(dry_run_actions=True, template_library=args.templates)
+        triggers = []
+        engine.subscribe("gesture", lambda name, packet: triggers.append((name, packet.index)))
+        start = time.perf_counter()
+        frames = replay_into(engine, recording, args.speed)
+        elapsed = time.perf_counter() - start
+        engine.actions.shutdown()
+        names, counts = np.unique(recording.evaluate(engine.templates).astype(str), return_counts=True)
+        gesture_frames = {name: int(count) for name, count in zip(names, counts) if name != "None"}
+        summary = {
+            "frames": frames,
+            "replay_fps": round(frames / elapsed, 1) if elapsed else None,
+            "gesture_frames": gesture_frames,
+            "triggers": [{"gesture": name, "frame": index} for name, index in triggers],
+        }
+    print(json.dumps(summary, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,243 @@
+"""
+Out-of-process MediaPipe inference over a shared-memory frame ring.
+
+RemoteHands is a drop-in replacement for a mediapipe Hands instance: process()
+copies the RGB frame into a free slot of a preallocated
+multiprocessing.shared_memory ring and sends only (slot, shape) to a child
+process, which runs Hands on a view of that slot and writes the landmarks back
+into the same slot as float32 arrays. Nothing image-sized is ever pickled, and
+the GUI process is left with capture and presentation only.
+
+Ring layout (one shared block):
+
+    frames      n_slots x frame_bytes            uint8 RGB, any shape that fits
+    landmarks   (n_slots, max_hands, 21, 3)      float32, normalized x, y, z
+    handedness  (n_slots, max_hands)             int8 HAND_* codes
+"""
+import multiprocessing
+import queue
+import time
+from collections import deque
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from gestures import NUM_LANDMARKS, HAND_LEFT, HAND_RIGHT, HAND_UNKNOWN
+
+
+def attach_shared_memory(name):
+    try:
+        # Python 3.13+: the creator owns the block, don't let this process unlink it
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+
+class FrameRing:
+    """Typed views over the shared block; the creating process owns (and unlinks) it."""
+
+    def __init__(self, n_slots, frame_bytes, max_hands, name=None):
+        self.n_slots = n_slots
+        self.frame_bytes = frame_bytes
+        self.max_hands = max_hands
+        landmark_bytes = n_slots * max_hands * NUM_LANDMARKS * 3 * 4
+        size = n_slots * frame_bytes + landmark_bytes + n_slots * max_hands
+        self.owner = name is None
+        if self.owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+        else:
+            self.shm = attach_shared_memory(name)
+        offset = n_slots * frame_bytes
+        self.landmarks = np.ndarray((n_slots, max_hands, NUM_LANDMARKS, 3), np.float32,
+                                    buffer=self.shm.buf, offset=offset)
+        self.handedness = np.ndarray((n_slots, max_hands), np.int8,
+                                     buffer=self.shm.buf, offset=offset + landmark_bytes)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def frame(self, slot, shape):
+        """Writable uint8 view of `slot` with the given image shape."""
+        return np.ndarray(shape, np.uint8, buffer=self.shm.buf, offset=slot * self.frame_bytes)
+
+    def close(self):
+        # Views must go before the buffer can be released
+        self.landmarks = self.handedness = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+class ArrayResults:
+    """
+    A hands.process() result carried as float32 arrays. Callers read
+    `points` and `handedness` directly (see gestures.hand_count); the
+    MediaPipe protobufs are built only for code that asks for them.
+    """
+
+    def __init__(self, points, handedness):
+        self.points = points  # (n_hands, 21, 3) float32
+        self.handedness = handedness  # (n_hands,) int8 HAND_* codes
+        self._landmarks = None
+        self._classifications = None
+
+    @classmethod
+    def empty(cls):
+        return cls(np.empty((0, NUM_LANDMARKS, 3), np.float32), np.empty(0, np.int8))
+
+    @property
+    def multi_hand_landmarks(self):
+        if not len(self.points):
+            return None
+        if self._landmarks is None:
+            from mediapipe.framework.formats import landmark_pb2
+            self._landmarks = []
+            for hand in self.points.tolist():
+                landmark_list = landmark_pb2.NormalizedLandmarkList()
+                for x, y, z in hand:
+                    landmark_list.landmark.add(x=x, y=y, z=z)
+                self._landmarks.append(landmark_list)
+        return self._landmarks
+
+    @property
+    def multi_handedness(self):
+        if not len(self.points):
+            return None
+        if self._classifications is None:
+            from mediapipe.framework.formats import classification_pb2
+            labels = {HAND_RIGHT: "Right", HAND_LEFT: "Left", HAND_UNKNOWN: ""}
+            self._classifications = []
+            for code in self.handedness.tolist():
+                classification_list = classification_pb2.ClassificationList()
+                classification_list.classification.add(label=labels[code])
+                self._classifications.append(classification_list)
+        return self._classifications
+
+    def remap(self, ox, oy, sx, sy):
+        """Map crop-normalized landmarks to the full frame (see inference.remap_landmarks)."""
+        self.points[..., 0] = ox + self.points[..., 0] * sx
+        self.points[..., 1] = oy + self.points[..., 1] * sy
+        self.points[..., 2] *= sx
+        self._landmarks = None
+
+
+def run_inference_server(requests, responses, hands_options):
+    """Child process: run Hands on ring slots until a None request arrives."""
+    from engine import create_hands
+    from gestures import landmarks_to_array, handedness_codes
+
+    hands = create_hands(**hands_options)
+    ring = None
+    try:
+        while True:
+            message = requests.get()
+            if message is None:
+                break
+            if message[0] == "attach":
+                _, name, n_slots, frame_bytes, max_hands = message
+                if ring is not None:
+                    ring.close()
+                ring = FrameRing(n_slots, frame_bytes, max_hands, name=name)
+                continue
+            _, slot, shape = message
+            results = hands.process(ring.frame(slot, shape))
+            n_hands = 0
+            if results.multi_hand_landmarks:
+                points = landmarks_to_array(results)[:ring.max_hands]
+                n_hands = len(points)
+                ring.landmarks[slot, :n_hands] = points
+                ring.handedness[slot, :n_hands] = handedness_codes(results)[:n_hands]
+            responses.put((slot, n_hands, time.monotonic()))
+    finally:
+        hands.close()
+        if ring is not None:
+            ring.close()
+
+
+class RemoteHands:
+    """Hands-compatible process()/close() backed by a child inference process."""
+
+    def __init__(self, max_num_hands=1, min_detection_confidence=0.8,
+                 min_tracking_confidence=0.6, model_complexity=1, static_image_mode=False,
+                 slots=4, timeout=2.0):
+        self.max_num_hands = max_num_hands
+        self.slots = slots
+        self.timeout = timeout
+        self.timeouts = 0
+        self.ring = None
+        self._free = deque(range(slots))
+        ctx = multiprocessing.get_context("spawn")
+        self.requests = ctx.Queue()
+        self.responses = ctx.Queue()
+        hands_options = {
+            "max_num_hands": max_num_hands,
+            "min_detection_confidence": min_detection_confidence,
+            "min_tracking_confidence": min_tracking_confidence,
+            "model_complexity": model_complexity,
+            "static_image_mode": static_image_mode,
+        }
+        self.worker = ctx.Process(target=run_inference_server, name="inference-server",
+                                  args=(self.requests, self.responses, hands_options), daemon=True)
+        self.worker.start()
+
+    def _create_ring(self, frame_bytes):
+        """
+        (Re)create the ring with `frame_bytes` slots and attach the child to it.
+        Requests still queued for the old ring are served from the old mapping,
+        which the child keeps until it reads the attach message; slot numbers
+        are the same in both rings, so their late answers still free a slot.
+        """
+        old = self.ring
+        self.ring = FrameRing(self.slots, frame_bytes, self.max_num_hands)
+        self.requests.put(("attach", self.ring.name, self.slots, frame_bytes, self.max_num_hands))
+        if old is not None:
+            old.close()
+
+    def _wait(self, timeout):
+        """Free the slot of the next response and return it, or None on timeout."""
+        try:
+            response = self.responses.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        self._free.append(response[0])
+        return response
+
+    def process(self, rgb):
+        rgb = np.ascontiguousarray(rgb)
+        # Sized from the first (full) frame; ROI crops and scaled inputs are smaller.
+        # A bigger frame (the warm-up frame was a blank stand-in, or the source
+        # changed resolution) grows the ring instead of failing.
+        if self.ring is None or rgb.nbytes > self.ring.frame_bytes:
+            self._create_ring(rgb.nbytes)
+        while not self._free:
+            # Every slot is still owned by requests that timed out earlier
+            if self._wait(self.timeout) is None:
+                self.timeouts += 1
+                return ArrayResults.empty()
+
+        slot = self._free.popleft()
+        self.ring.frame(slot, rgb.shape)[...] = rgb
+        self.requests.put(("frame", slot, rgb.shape))
+
+        deadline = time.monotonic() + self.timeout
+        while True:
+            response = self._wait(max(0.0, deadline - time.monotonic()))
+            if response is None:
+                self.timeouts += 1
+                return ArrayResults.empty()
+            if response[0] == slot:
+                break  # Late answers for abandoned slots only free their slot
+        n_hands = response[1]
+        # Copy out: the slot is reused by the next frame
+        return ArrayResults(self.ring.landmarks[slot, :n_hands].copy(),
+                            self.ring.handedness[slot, :n_hands].copy())
+
+    def close(self):
+        self.requests.put(None)
+        self.worker.join(self.timeout)
+        if self.worker.is_alive():
+            self.worker.terminate()
+        if self.ring is not None:
+            self.ring.close()
+            self.ring = None
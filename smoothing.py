@@ -0,0 +1,126 @@
+"""
+Landmark smoothing and resampling for display.
+
+OneEuroFilter is the 1€ filter (Casiez et al.): a low-pass filter whose cutoff
+rises with speed, so a still hand stops jittering while a fast one lags
+little. It filters a whole landmark array per call, one independent filter per
+coordinate.
+
+PoseTrack keeps the last few filtered, capture-timestamped poses and answers
+"where is the hand now?" at any time: it renders one inference interval in
+the past and interpolates between the two poses around that moment, or
+extrapolates a little along the filtered velocity when inference is late. The
+wireframe can then animate at the display rate however slowly inference runs.
+"""
+import math
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+
+def smoothing_factor(dt, cutoff):
+    tau = 1.0 / (2 * math.pi * cutoff)
+    return 1.0 / (1.0 + tau / dt)
+
+
+class OneEuroFilter:
+    """
+    Vectorized 1€ filter. `min_cutoff` (Hz) sets the smoothing of slow motion,
+    `beta` how fast the cutoff rises with speed (in units of the input per
+    second, normalized landmark coordinates here).
+    """
+
+    def __init__(self, min_cutoff=1.5, beta=5.0, d_cutoff=1.0):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.reset()
+
+    def reset(self):
+        self.value = None
+        self.velocity = None
+        self.t = None
+
+    def __call__(self, x, t):
+        """Filter `x` sampled at `t` seconds; returns the filtered array."""
+        x = np.asarray(x, dtype=np.float32)
+        if self.value is None or self.value.shape != x.shape:
+            self.value = x.copy()
+            self.velocity = np.zeros_like(x)
+            self.t = t
+            return self.value
+        dt = t - self.t
+        if dt <= 0:
+            return self.value
+        a_d = smoothing_factor(dt, self.d_cutoff)
+        self.velocity += a_d * ((x - self.value) / dt - self.velocity)
+        cutoff = self.min_cutoff + self.beta * np.abs(self.velocity)
+        # Per-coordinate smoothing factor, same formula as smoothing_factor()
+        a = 1.0 / (1.0 + 1.0 / (2 * np.pi * cutoff * dt))
+        self.value = self.value + a * (x - self.value)
+        self.t = t
+        return self.value
+
+
+class PoseTrack:
+    """
+    Timestamped pose history for one hand. push() from any thread, sample()
+    from the display. `delay=None` renders one (smoothed) inference interval
+    behind the newest pose so there is always a pair to interpolate; a fixed
+    delay of 0 always extrapolates. Poses older than `hold` seconds are
+    dropped.
+    """
+
+    def __init__(self, history=4, delay=None, max_extrapolation=0.1, hold=0.5, filter=None):
+        self.delay = delay
+        self.max_extrapolation = max_extrapolation
+        self.hold = hold
+        self.filter = filter if filter is not None else OneEuroFilter()
+        self._poses = deque(maxlen=history)  # (captured_at, points)
+        self._interval = None  # EMA of the time between poses
+        self._lag = None  # EMA of capture -> push delay
+        self._pushed_at = None
+        self._lock = threading.Lock()
+
+    def push(self, points, captured_at, now=None):
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            filtered = self.filter(points, captured_at)
+            if self._poses:
+                interval = captured_at - self._poses[-1][0]
+                if interval <= 0:
+                    return
+                self._interval = interval if self._interval is None else 0.8 * self._interval + 0.2 * interval
+            lag = now - captured_at
+            self._lag = lag if self._lag is None else 0.8 * self._lag + 0.2 * lag
+            self._poses.append((captured_at, filtered))
+            self._pushed_at = now
+
+    def clear(self):
+        with self._lock:
+            self._poses.clear()
+            self.filter.reset()
+            self._interval = self._lag = self._pushed_at = None
+
+    def sample(self, now=None):
+        """The pose to show at `now`, or None when there is no recent one."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if not self._poses or now - self._pushed_at > self.hold:
+                return None
+            delay = self.delay if self.delay is not None else min(self._interval or 0.0, 0.2)
+            # Same clock as the capture timestamps, shifted by the pipeline latency
+            t = now - self._lag - delay
+
+            newest_t, newest = self._poses[-1]
+            if t >= newest_t:
+                ahead = min(t - newest_t, self.max_extrapolation)
+                if ahead <= 0 or self.filter.velocity is None:
+                    return newest
+                return newest + self.filter.velocity * ahead
+            for (t0, p0), (t1, p1) in zip(reversed(list(self._poses)[:-1]), reversed(self._poses)):
+                if t >= t0:
+                    return p0 + (p1 - p0) * ((t - t0) / (t1 - t0))
+            return self._poses[0][1]
@@ -0,0 +1,55 @@
+"""
+Startup timeline.
+
+`profiler` is a process-wide StartupProfiler. Startup code wraps its steps in
+profiler.span("...") (imports, window creation, Hands graph, camera, warm-up)
+and drops profiler.mark("...") at milestones; `python main.py
+--profile-startup` prints the timeline once monitoring is active. Recording is
+a couple of perf_counter() calls per step, so spans stay in place when the
+profiler is not enabled.
+"""
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+
+class StartupProfiler:
+    def __init__(self):
+        self.t0 = time.perf_counter()
+        self.enabled = False
+        self.events = []  # (start_s, duration_s or None, thread name, label)
+        self._lock = threading.Lock()
+        self._reported = False
+
+    def _record(self, start, duration, label):
+        with self._lock:
+            self.events.append((start - self.t0, duration, threading.current_thread().name, label))
+
+    @contextmanager
+    def span(self, label):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._record(start, time.perf_counter() - start, label)
+
+    def mark(self, label):
+        self._record(time.perf_counter(), None, label)
+
+    def report(self, out=None):
+        """Print the timeline (once) if profiling is enabled."""
+        with self._lock:
+            if not self.enabled or self._reported:
+                return
+            self._reported = True
+            events = sorted(self.events)
+        out = out or sys.stderr
+        print("Startup timeline (ms since main.py was loaded):", file=out)
+        for start, duration, thread, label in events:
+            took = f"{duration * 1000:9.1f}" if duration is not None else " " * 9
+            print(f"  {start * 1000:9.1f} {took}  [{thread}] {label}", file=out)
+        out.flush()
+
+
+profiler = StartupProfiler()
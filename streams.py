@@ -0,0 +1,245 @@
+"""
+Multi-camera monitoring with one inference worker process per stream.
+
+Each capture source gets its own process with its own Hands model, so streams
+never share a GIL with each other or with the GUI. Workers capture, infer and
+evaluate gestures locally and send compact StreamResult records (float32
+landmarks, no images) back over one multiprocessing queue. MultiStreamEngine
+merges them into the normal GestureEngine event stream, with `packet.stream`
+telling the sources apart, so the GUI and the headless runner work unchanged.
+
+Sources use the capture.open_source() spec, so workers can run on video
+files or synthetic frames instead of cameras.
+"""
+import multiprocessing
+import queue
+import threading
+import time
+import traceback
+from collections import namedtuple
+
+from engine import GestureEngine
+from pipeline import FramePacket
+from recording import LandmarkRecorder
+from startup import profiler
+
+StreamResult = namedtuple(
+    "StreamResult",
+    "stream index captured_at inferred_at decided_at points handedness gesture dropped",
+)
+
+# Results waiting in the parent per stream before workers start dropping them
+QUEUE_DEPTH_PER_STREAM = 8
+
+
+def run_stream_worker(stream, spec, options, results, stop_event):
+    """Worker process entry point: capture -> inference -> gesture decision for one source."""
+    # Heavy imports happen in the child, after spawn
+    import cv2
+    from capture import CameraSource, describe_settings, open_source
+    from engine import create_hands, create_inference
+    from inference import MotionGate
+    from gestures import decide_gesture, landmarks_to_array, handedness_codes
+    from templates import TemplateRecognizer
+
+    source = hands = crop_hands = None
+    try:
+        # Setup is inside the try too: whatever fails, the parent hears "ended"
+        source = open_source(spec, camera_options=options["capture_options"])
+        if not source.isOpened():
+            results.put(("log", stream, f"ERROR: Could not open source {spec!r}."))
+            return
+        results.put(("log", stream, f"Capture {describe_settings(source.settings())}"))
+        hands = create_hands(options["max_num_hands"], options["min_detection_confidence"],
+                             options["min_tracking_confidence"], options["model_complexity"])
+        if options["roi"]:
+            crop_hands = create_hands(options["max_num_hands"], options["min_detection_confidence"],
+                                      options["min_tracking_confidence"], options["model_complexity"],
+                                      static_image_mode=True)
+        inference = create_inference(hands, options["roi"], options["latency_budget_ms"],
+                                     options["input_scale"], crop_hands)
+        process = inference.process if inference else hands.process
+        motion_gate = MotionGate(options["max_skip_frames"]) if options["motion_gate"] else None
+        templates = None
+        if options["template_library"]:
+            templates = TemplateRecognizer(options["template_library"],
+                                           log=lambda message: results.put(("log", stream, message)))
+            templates.preload()
+        is_camera = isinstance(source, CameraSource)
+
+        index = 0
+        dropped = 0
+        last = None
+        # One frame at a time in a worker, so one buffer per step is enough
+        raw = flipped = rgb = None
+        while not stop_event.is_set():
+            success, raw = source.read(raw)
+            if not success:
+                if is_camera:
+                    time.sleep(0.1)
+                    continue
+                break  # file or synthetic source is exhausted
+            captured_at = source.captured_at if is_camera else time.monotonic()
+            if flipped is None or flipped.shape != raw.shape:
+                flipped, rgb = raw.copy(), raw.copy()
+            image = cv2.flip(raw, 1, dst=flipped)
+            index += 1
+
+            if last is not None and motion_gate and motion_gate.should_skip(image):
+                points, handedness = last
+            else:
+                output = process(cv2.cvtColor(image, cv2.COLOR_BGR2RGB, dst=rgb))
+                if output.multi_hand_landmarks:
+                    points, handedness = landmarks_to_array(output), handedness_codes(output)
+                else:
+                    points = handedness = None
+                last = points, handedness
+            inferred_at = time.monotonic()
+            gesture = decide_gesture(points, handedness, templates) if points is not None else None
+            result = StreamResult(stream, index, captured_at, inferred_at, time.monotonic(),
+                                  points, handedness, gesture, dropped)
+            try:
+                results.put_nowait(result)
+            except queue.Full:
+                # The parent is behind: lose this result rather than stall capture
+                dropped += 1
+    except Exception as e:
+        traceback.print_exc()
+        try:
+            results.put(("log", stream, f"ERROR: Stream worker failed: {e!r}"), timeout=1.0)
+        except queue.Full:
+            pass
+    finally:
+        if hands is not None:
+            hands.close()
+        if crop_hands is not None:
+            crop_hands.close()
+        if source is not None:
+            source.release()
+        try:
+            results.put(("ended", stream), timeout=1.0)
+        except queue.Full:
+            pass  # The parent stopped reading and will terminate us
+
+
+class MultiStreamEngine(GestureEngine):
+    """
+    GestureEngine over several capture sources, one worker process each.
+    There is no presentation stage: workers send landmarks, not images, so
+    `frame` events are never emitted.
+    """
+
+    def __init__(self, sources, **kwargs):
+        super().__init__(**kwargs)
+        self.sources = list(sources)
+        self.processes = []
+        self.results = None
+        self._stop_workers = None
+        self._collector = None
+        self._ended = set()
+        self._stream_stats = {}
+
+    def open(self):
+        # Every worker opens its own source and model
+        return True
+
+    def start(self):
+        # spawn: a fresh interpreter per worker, no forked MediaPipe/camera state
+        ctx = multiprocessing.get_context("spawn")
+        self.results = ctx.Queue(QUEUE_DEPTH_PER_STREAM * len(self.sources))
+        self._stop_workers = ctx.Event()
+        options = {
+            "max_num_hands": self.max_num_hands,
+            "min_detection_confidence": self.min_detection_confidence,
+            "min_tracking_confidence": self.min_tracking_confidence,
+            "model_complexity": self.model_complexity,
+            "input_scale": self.input_scale,
+            "roi": self.roi,
+            "latency_budget_ms": self.latency_budget_ms,
+            "motion_gate": self.motion_gate is not None,
+            "max_skip_frames": self.motion_gate.max_skip if self.motion_gate else 0,
+            "capture_options": self.capture_options,
+            "template_library": self.template_library,
+        }
+        if self.record_path and self.recorder is None:
+            self.recorder = LandmarkRecorder(self.record_path)
+        self._ended.clear()
+        self._stream_stats = {stream: {"processed": 0, "dropped": 0} for stream in range(len(self.sources))}
+        self.processes = [
+            ctx.Process(target=run_stream_worker, name=f"stream-{stream}",
+                        args=(stream, spec, options, self.results, self._stop_workers), daemon=True)
+            for stream, spec in enumerate(self.sources)
+        ]
+        for process in self.processes:
+            process.start()
+
+        self.running = True
+        self._stopped.clear()
+        self._collector = threading.Thread(target=self._collect, name="stream-collector", daemon=True)
+        self._collector.start()
+
+        self.log(f"Monitoring {len(self.sources)} streams, one inference process each")
+        self.set_status("Instant Monitoring...", "#3b82f6")
+        profiler.mark("monitoring active")
+        self.emit("started")
+        return True
+
+    def _collect(self):
+        while self.running:
+            try:
+                message = self.results.get(timeout=0.1)
+            except queue.Empty:
+                # A worker killed outright (or dead before its finally) never says "ended"
+                for stream, process in enumerate(self.processes):
+                    if stream not in self._ended and not process.is_alive():
+                        self.stream_ended(stream, f"Stream {stream} worker exited (code {process.exitcode}).")
+                continue
+            if isinstance(message, StreamResult):
+                self.handle_result(message)
+            elif message[0] == "log":
+                self.log(f"[stream {message[1]}] {message[2]}")
+            elif message[0] == "ended" and message[1] not in self._ended:
+                self.stream_ended(message[1], f"Stream {message[1]} ended.")
+
+    def stream_ended(self, stream, message):
+        self._ended.add(stream)
+        self.log(message)
+        if len(self._ended) == len(self.sources):
+            self.stop()
+
+    def handle_result(self, result):
+        stats = self._stream_stats[result.stream]
+        stats["processed"] += 1
+        stats["dropped"] = result.dropped
+
+        packet = FramePacket(result.index, None, result.captured_at, stream=result.stream)
+        packet.inferred_at = result.inferred_at
+        packet.decided_at = result.decided_at
+        packet.points = result.points
+        packet.handedness = result.handedness
+        self.latency.record("capture_to_inference", packet.captured_at, packet.inferred_at)
+        self.latency.record("inference_to_decision", packet.inferred_at, packet.decided_at)
+        self.latency.record("capture_to_decision", packet.captured_at, packet.decided_at)
+        self.handle_decision(packet, result.gesture)
+
+    def stop(self):
+        if self._stop_workers is not None:
+            self._stop_workers.set()
+        super().stop()
+
+    def close(self, timeout=2.0):
+        self.stop()
+        # The collector writes to the recorder: it must be done before the base
+        # class closes the recorder and the action executor
+        if self._collector is not None and self._collector is not threading.current_thread():
+            self._collector.join(timeout)
+        for process in self.processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        self.processes = []
+        super().close(timeout)
+
+    def stats(self):
+        """Per-stream processed/dropped counters, keyed like the pipeline stages."""
+        return {f"stream-{stream}": dict(stats) for stream, stats in self._stream_stats.items()}
@@ -0,0 +1,304 @@
+"""
+Template-based custom gestures.
+
+Operators record a few dozen examples of a pose and give it a name; the
+monitor then recognizes it like the built-in middle-finger rule, and
+`--action NAME=SPEC` binds it to an action.
+
+Every hand is normalized before it is stored or looked up: landmarks are
+taken relative to the wrist, divided by the wrist -> middle-finger MCP
+distance (so distance from the camera does not matter) and left hands are
+mirrored onto right hands. A library is a .npz file with one packed float32
+row per template; classification is a single vectorized nearest-neighbour
+pass over that array (hundreds of templates take microseconds), accepted when
+the nearest template is closer than the library's distance threshold.
+
+    python templates.py capture gestures.npz peace --seconds 5
+    python templates.py add gestures.npz peace session.hglr --start 12 --end 15
+    python templates.py info gestures.npz
+    python main.py --templates gestures.npz --action peace=shell:notify-send peace
+
+TemplateRecognizer loads the library on first use, or on a background thread
+started by preload(), so a large library never delays startup.
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+from gestures import HAND_LEFT, NUM_LANDMARKS
+
+WRIST = 0
+MIDDLE_MCP = 9
+FEATURE_SIZE = NUM_LANDMARKS * 3
+DEFAULT_THRESHOLD = 0.5  # Euclidean distance between normalized hands, in palm lengths
+
+
+def normalize_landmarks(points, handedness=0):
+    """
+    Feature vectors (..., 63) for landmarks (..., 21, 3): wrist-relative,
+    scaled to a unit wrist -> middle MCP distance, left hands mirrored.
+    """
+    points = np.asarray(points, dtype=np.float32)
+    relative = points - points[..., WRIST:WRIST + 1, :]
+    scale = np.linalg.norm(relative[..., MIDDLE_MCP, :2], axis=-1)
+    # Degenerate hands (all landmarks on the wrist) fall back to their largest extent
+    fallback = np.abs(relative).max(axis=(-2, -1))
+    scale = np.where(scale > 1e-6, scale, np.where(fallback > 1e-6, fallback, 1.0))
+    relative /= scale[..., None, None]
+    handedness = np.broadcast_to(np.asarray(handedness, dtype=np.int8), points.shape[:-2])
+    relative[..., 0] *= np.where(handedness == HAND_LEFT, -1.0, 1.0)[..., None]
+    return relative.reshape(points.shape[:-2] + (FEATURE_SIZE,))
+
+
+class TemplateLibrary:
+    """Named templates packed into one (n, 63) float32 array."""
+
+    def __init__(self, names=(), features=None, labels=None, threshold=DEFAULT_THRESHOLD):
+        self.names = list(names)
+        self.features = (np.zeros((0, FEATURE_SIZE), dtype=np.float32) if features is None
+                         else np.ascontiguousarray(features, dtype=np.float32))
+        self.labels = np.zeros(0, dtype=np.int32) if labels is None else np.asarray(labels, dtype=np.int32)
+        self.threshold = threshold
+        self._index()
+
+    def _index(self):
+        # Squared norms for |q - f|^2 = |q|^2 + |f|^2 - 2 q.f
+        self._norms = np.einsum("ij,ij->i", self.features, self.features)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            return cls([str(name) for name in data["names"]], data["features"], data["labels"],
+                       float(data["threshold"]))
+
+    def save(self, path):
+        tmp = path + ".tmp.npz"
+        np.savez(tmp, names=np.array(self.names, dtype=str), features=self.features,
+                 labels=self.labels, threshold=np.float32(self.threshold))
+        os.replace(tmp, path)
+
+    def __len__(self):
+        return len(self.features)
+
+    def counts(self):
+        """Templates per gesture name."""
+        per_label = np.bincount(self.labels, minlength=len(self.names))
+        return {name: int(count) for name, count in zip(self.names, per_label) if count}
+
+    def add(self, name, points, handedness=0):
+        """Add every hand in `points` ((n, 21, 3) with (n,) handedness) as a template of `name`."""
+        features = normalize_landmarks(points, handedness).reshape(-1, FEATURE_SIZE)
+        if name not in self.names:
+            self.names.append(name)
+        label = self.names.index(name)
+        self.features = np.concatenate([self.features, features])
+        self.labels = np.concatenate([self.labels, np.full(len(features), label, dtype=np.int32)])
+        self._index()
+        return len(features)
+
+    def remove(self, name):
+        if name not in self.names:
+            return 0
+        label = self.names.index(name)
+        keep = self.labels != label
+        removed = int((~keep).sum())
+        self.features = self.features[keep]
+        # Labels above the removed one shift down with the names list
+        self.labels = self.labels[keep] - (self.labels[keep] > label)
+        del self.names[label]
+        self._index()
+        return removed
+
+    def nearest(self, features):
+        """Index of and distance to the nearest template for each row of `features` (n, 63)."""
+        features = np.asarray(features, dtype=np.float32).reshape(-1, FEATURE_SIZE)
+        squared = (np.einsum("ij,ij->i", features, features)[:, None] + self._norms[None, :]
+                   - 2.0 * features @ self.features.T)
+        index = squared.argmin(axis=1)
+        distance = np.sqrt(np.maximum(squared[np.arange(len(features)), index], 0.0))
+        return index, distance
+
+    def classify(self, points, handedness=0):
+        """Gesture name (or None) per hand in `points` (n_hands, 21, 3)."""
+        if not len(self.features) or not len(points):
+            return [None] * len(points)
+        index, distance = self.nearest(normalize_landmarks(points, handedness))
+        return [self.names[self.labels[i]] if d <= self.threshold else None
+                for i, d in zip(index.tolist(), distance.tolist())]
+
+
+class TemplateRecognizer:
+    """A TemplateLibrary loaded from `path` on first use (thread-safe)."""
+
+    def __init__(self, path, threshold=None, log=print):
+        self.path = path
+        self.threshold = threshold  # Overrides the library's own threshold
+        self.log = log
+        self._library = None
+        self._lock = threading.Lock()
+
+    @property
+    def library(self):
+        if self._library is None:
+            with self._lock:
+                if self._library is None:
+                    try:
+                        library = TemplateLibrary.load(self.path)
+                    except (OSError, KeyError, ValueError) as e:
+                        self.log(f"ERROR: Could not load gesture templates from {self.path}: {e}")
+                        library = TemplateLibrary()
+                    if self.threshold is not None:
+                        library.threshold = self.threshold
+                    if len(library):
+                        counts = ", ".join(f"{name} ({count})" for name, count in library.counts().items())
+                        self.log(f"Gesture templates loaded: {counts}")
+                    self._library = library
+        return self._library
+
+    def preload(self):
+        """Load in the background so the first classified frame does not wait for the disk."""
+        threading.Thread(target=lambda: self.library, name="template-load", daemon=True).start()
+
+
+# --- COMMAND LINE ---
+def load_or_create(path, threshold=None):
+    library = TemplateLibrary.load(path) if os.path.exists(path) else TemplateLibrary()
+    if threshold is not None:
+        library.threshold = threshold
+    return library
+
+
+def recording_hands(recording, start=None, end=None, every=1):
+    """(points, handedness) of the first hand in every `every`-th record with a hand."""
+    records = recording.records if start is None and end is None else \
+        recording.between(start or 0.0, end if end is not None else float("inf"))
+    records = records[records["n_hands"] > 0][::every]
+    return np.array(records["points"][:, 0]), np.array(records["handedness"][:, 0])
+
+
+def capture_hands(spec, seconds, every=1, countdown=3):
+    """Capture the first hand from a live source for `seconds`, every `every`-th frame."""
+    import cv2
+    from capture import open_source
+    from engine import create_hands
+    from gestures import landmarks_to_array, handedness_codes
+
+    source = open_source(spec)
+    if not source.isOpened():
+        raise RuntimeError(f"Could not open source {spec!r}")
+    hands = create_hands(1, 0.7, 0.5)
+    points, handedness = [], []
+    try:
+        for remaining in range(countdown, 0, -1):
+            print(f"Show the gesture in {remaining}...", file=sys.stderr)
+            time.sleep(1)
+        print("Recording.", file=sys.stderr)
+        end = time.monotonic() + seconds
+        frame = 0
+        while time.monotonic() < end:
+            success, image = source.read()
+            if not success:
+                continue
+            frame += 1
+            if frame % every:
+                continue
+            results = hands.process(cv2.cvtColor(cv2.flip(image, 1), cv2.COLOR_BGR2RGB))
+            if results.multi_hand_landmarks:
+                points.append(landmarks_to_array(results)[0])
+                handedness.append(handedness_codes(results)[0])
+    finally:
+        hands.close()
+        source.release()
+    return np.array(points, dtype=np.float32).reshape(-1, NUM_LANDMARKS, 3), np.array(handedness, dtype=np.int8)
+
+
+def lookup_time_us(library, queries=1000):
+    """Mean single-hand classify() time in microseconds, on random hands."""
+    rng = np.random.default_rng(0)
+    points = rng.random((queries, 1, NUM_LANDMARKS, 3), dtype=np.float32)
+    start = time.perf_counter()
+    for hand in points:
+        library.classify(hand)
+    return round((time.perf_counter() - start) / queries * 1e6, 1)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Record and inspect custom gesture templates")
+    sub = parser.add_subparsers(dest="command", required=True)
+    capture = sub.add_parser("capture", help="record templates of NAME from a camera or video")
+    capture.add_argument("library")
+    capture.add_argument("name")
+    capture.add_argument("--source", default="0", help="camera index, video file or image directory (default: 0)")
+    capture.add_argument("--seconds", type=float, default=5.0, help="how long to record (default: 5)")
+    capture.add_argument("--every", type=int, default=3, help="keep every Nth frame (default: 3)")
+    add = sub.add_parser("add", help="add templates of NAME from a landmark recording (see recording.py)")
+    add.add_argument("library")
+    add.add_argument("name")
+    add.add_argument("recording")
+    add.add_argument("--start", type=float, help="seconds from the start of the recording")
+    add.add_argument("--end", type=float, help="seconds from the start of the recording")
+    add.add_argument("--every", type=int, default=1, help="keep every Nth frame with a hand (default: 1)")
+    for command in (capture, add):
+        command.add_argument("--threshold", type=float,
+                             help=f"match distance to store in the library (default: {DEFAULT_THRESHOLD})")
+    remove = sub.add_parser("remove", help="delete every template of NAME")
+    remove.add_argument("library")
+    remove.add_argument("name")
+    info = sub.add_parser("info", help="templates per gesture and lookup time")
+    info.add_argument("library")
+    test = sub.add_parser("test", help="classify every frame of a landmark recording")
+    test.add_argument("library")
+    test.add_argument("recording")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.command in ("capture", "add"):
+        library = load_or_create(args.library, args.threshold)
+        if args.command == "capture":
+            points, handedness = capture_hands(args.source, args.seconds, args.every)
+        else:
+            from recording import LandmarkRecording
+            points, handedness = recording_hands(LandmarkRecording(args.recording), args.start, args.end,
+                                                 args.every)
+        if not len(points):
+            print("ERROR: No hands found, nothing added.", file=sys.stderr)
+            return 1
+        added = library.add(args.name, points, handedness)
+        library.save(args.library)
+        summary = {"added": added, "templates": library.counts()}
+    elif args.command == "remove":
+        library = TemplateLibrary.load(args.library)
+        removed = library.remove(args.name)
+        library.save(args.library)
+        summary = {"removed": removed, "templates": library.counts()}
+    elif args.command == "info":
+        library = TemplateLibrary.load(args.library)
+        summary = {
+            "templates": library.counts(),
+            "total": len(library),
+            "threshold": round(library.threshold, 4),
+            "lookup_us": lookup_time_us(library),
+        }
+    else:
+        from recording import LandmarkRecording
+        library = TemplateLibrary.load(args.library)
+        points, handedness = recording_hands(LandmarkRecording(args.recording))
+        names = library.classify(points, handedness)
+        matches = {}
+        for name in names:
+            key = name or "(none)"
+            matches[key] = matches.get(key, 0) + 1
+        summary = {"frames_with_hands": len(points), "matches": matches}
+    print(json.dumps(summary, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,233 @@
+"""
+Offline auto-tuner for the Hands model settings.
+
+Sweeps model_complexity, input scale and the detection/tracking confidence
+thresholds over a labelled clip, measures per-frame latency, CPU time and
+gesture-decision accuracy for every combination, and writes the
+Pareto-optimal ones to a profile file:
+
+    python tune.py clip.mp4 clip.labels.json --output profile.json
+    python main.py --tuning-profile profile.json
+
+Labels are JSON mapping a gesture name to inclusive [first, last] frame
+ranges (0-based, in clip order) where the gesture is shown, e.g.
+{"middle_finger": [[120, 180], [400, 433]]}; every other frame is a negative.
+Frames are decided like the engine does (built-in rule first, then templates),
+so any other gesture needs the template library that defines it:
+
+    python tune.py clip.mp4 clip.labels.json --gesture peace --templates gestures.npz
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from capture import open_source
+from engine import create_hands, create_inference
+from gestures import BUILTIN_GESTURE, decide_gesture, hand_count, landmarks_to_array, handedness_codes
+from templates import TemplateRecognizer
+
+DEFAULT_GRID = {
+    "model_complexity": [0, 1],
+    "input_scale": [1.0, 0.75, 0.5],
+    "min_detection_confidence": [0.5, 0.7, 0.8],
+    "min_tracking_confidence": [0.5, 0.6, 0.8],
+}
+# Engine options a profile may set
+PROFILE_KEYS = tuple(DEFAULT_GRID)
+WARMUP_FRAMES = 5  # Excluded from latency, not from accuracy
+
+
+def load_labels(path, gesture=BUILTIN_GESTURE):
+    with open(path) as f:
+        ranges = json.load(f).get(gesture, [])
+    return [(int(first), int(last)) for first, last in ranges]
+
+
+def label_vector(ranges, n_frames):
+    truth = np.zeros(n_frames, dtype=bool)
+    for first, last in ranges:
+        truth[max(0, first):min(n_frames, last + 1)] = True
+    return truth
+
+
+def decision_scores(predicted, truth):
+    tp = int(np.count_nonzero(predicted & truth))
+    fp = int(np.count_nonzero(predicted & ~truth))
+    fn = int(np.count_nonzero(~predicted & truth))
+    precision = tp / (tp + fp) if tp + fp else 1.0
+    recall = tp / (tp + fn) if tp + fn else 1.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return {
+        "precision": round(precision, 4),
+        "recall": round(recall, 4),
+        "f1": round(f1, 4),
+        "accuracy": round(float(np.mean(predicted == truth)), 4),
+        "false_triggers": fp,
+    }
+
+
+def evaluate_config(clip, config, max_frames=None, gesture=BUILTIN_GESTURE, templates=None):
+    """
+    Run one configuration over the clip; returns per-frame decisions (True
+    where `gesture` was decided) and timings.
+    """
+    source = open_source(clip)
+    if not source.isOpened():
+        raise RuntimeError(f"Could not open clip {clip!r}")
+    hands = create_hands(1, config["min_detection_confidence"], config["min_tracking_confidence"],
+                         config["model_complexity"])
+    inference = create_inference(hands, input_scale=config["input_scale"])
+    process = inference.process if inference else hands.process
+    decisions = []
+    latencies = []
+    cpu = 0.0
+    try:
+        while max_frames is None or len(decisions) < max_frames:
+            success, image = source.read()
+            if not success:
+                break
+            # Same frame path as the engine; decoding is outside the measurement
+            wall_start = time.perf_counter()
+            cpu_start = time.process_time()
+            rgb = cv2.cvtColor(cv2.flip(image, 1), cv2.COLOR_BGR2RGB)
+            results = process(rgb)
+            decided = None
+            if hand_count(results):
+                decided = decide_gesture(landmarks_to_array(results), handedness_codes(results), templates)
+            elapsed = time.perf_counter() - wall_start
+            if len(decisions) >= WARMUP_FRAMES:
+                latencies.append(elapsed)
+                cpu += time.process_time() - cpu_start
+            decisions.append(decided == gesture)
+    finally:
+        hands.close()
+        source.release()
+    return np.array(decisions, dtype=bool), np.array(latencies), cpu
+
+
+def pareto_front(rows):
+    """Rows not dominated on (p95 latency, CPU per frame, F1)."""
+    def dominates(a, b):
+        no_worse = (a["p95_ms"] <= b["p95_ms"] and a["cpu_ms_per_frame"] <= b["cpu_ms_per_frame"]
+                    and a["f1"] >= b["f1"])
+        better = (a["p95_ms"] < b["p95_ms"] or a["cpu_ms_per_frame"] < b["cpu_ms_per_frame"]
+                  or a["f1"] > b["f1"])
+        return no_worse and better
+
+    return [row for row in rows if not any(dominates(other, row) for other in rows)]
+
+
+def recommend(front, f1_tolerance):
+    """Fastest (p95) configuration within `f1_tolerance` of the best F1 on the front."""
+    best_f1 = max(row["f1"] for row in front)
+    candidates = [row for row in front if row["f1"] >= best_f1 - f1_tolerance]
+    return min(candidates, key=lambda row: (row["p95_ms"], row["cpu_ms_per_frame"]))
+
+
+def sweep(clip, truth_ranges, grid, max_frames=None, log=print, gesture=BUILTIN_GESTURE, templates=None):
+    rows = []
+    combinations = list(itertools.product(*(grid[key] for key in PROFILE_KEYS)))
+    for n, values in enumerate(combinations, 1):
+        config = dict(zip(PROFILE_KEYS, values))
+        decisions, latencies, cpu = evaluate_config(clip, config, max_frames, gesture, templates)
+        if not len(latencies):
+            raise RuntimeError(f"Clip {clip!r} has no frames after the {WARMUP_FRAMES} warm-up frames")
+        truth = label_vector(truth_ranges, len(decisions))
+        ms = latencies * 1000
+        row = dict(config)
+        row.update({
+            "frames": len(decisions),
+            "p50_ms": round(float(np.percentile(ms, 50)), 3),
+            "p95_ms": round(float(np.percentile(ms, 95)), 3),
+            "cpu_ms_per_frame": round(cpu * 1000 / len(latencies), 3),
+        })
+        row.update(decision_scores(decisions, truth))
+        rows.append(row)
+        log(f"[{n}/{len(combinations)}] {config} -> p95 {row['p95_ms']} ms, "
+            f"cpu {row['cpu_ms_per_frame']} ms, F1 {row['f1']}")
+    return rows
+
+
+def load_profile(path):
+    """Engine keyword arguments from a profile's recommended configuration."""
+    with open(path) as f:
+        profile = json.load(f)
+    recommended = profile["recommended"]
+    return {key: recommended[key] for key in PROFILE_KEYS if key in recommended}
+
+
+def parse_values(kind):
+    def parse(text):
+        return [kind(value) for value in text.split(",")]
+    return parse
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Sweep Hands settings over a labelled clip")
+    parser.add_argument("clip", help="video file or image directory")
+    parser.add_argument("labels", help="JSON gesture -> [[first, last], ...] frame ranges")
+    parser.add_argument("--gesture", default=BUILTIN_GESTURE,
+                        help=f"labelled gesture to score (default: {BUILTIN_GESTURE})")
+    parser.add_argument("--templates", metavar="PATH",
+                        help="template library (see templates.py) defining --gesture, "
+                             f"required for anything but {BUILTIN_GESTURE}")
+    parser.add_argument("--output", default="profile.json", help="profile file to write")
+    parser.add_argument("--max-frames", type=int, help="only use the first N frames of the clip")
+    parser.add_argument("--f1-tolerance", type=float, default=0.02,
+                        help="accept this much lower F1 than the best for a faster config (default: 0.02)")
+    parser.add_argument("--model-complexity", type=parse_values(int), default=DEFAULT_GRID["model_complexity"])
+    parser.add_argument("--input-scale", type=parse_values(float), default=DEFAULT_GRID["input_scale"])
+    parser.add_argument("--min-detection-confidence", type=parse_values(float),
+                        default=DEFAULT_GRID["min_detection_confidence"])
+    parser.add_argument("--min-tracking-confidence", type=parse_values(float),
+                        default=DEFAULT_GRID["min_tracking_confidence"])
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    log = lambda line: print(line, file=sys.stderr)
+    templates = None
+    if args.templates:
+        templates = TemplateRecognizer(args.templates, log=log)
+        if args.gesture != BUILTIN_GESTURE and args.gesture not in templates.library.names:
+            print(f"ERROR: {args.templates} has no templates of {args.gesture!r}.", file=sys.stderr)
+            return 2
+    elif args.gesture != BUILTIN_GESTURE:
+        print(f"ERROR: Only {BUILTIN_GESTURE} is built in; pass --templates to score {args.gesture!r}.",
+              file=sys.stderr)
+        return 2
+    grid = {key: getattr(args, key) for key in PROFILE_KEYS}
+    truth_ranges = load_labels(args.labels, args.gesture)
+    rows = sweep(args.clip, truth_ranges, grid, args.max_frames, log, args.gesture, templates)
+    front = sorted(pareto_front(rows), key=lambda row: row["p95_ms"])
+    profile = {
+        "clip": os.path.basename(args.clip),
+        "gesture": args.gesture,
+        "templates": args.templates,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "hardware": {
+            "platform": platform.platform(),
+            "processor": platform.processor(),
+            "cpu_count": os.cpu_count(),
+        },
+        "recommended": recommend(front, args.f1_tolerance),
+        "pareto": front,
+        "all": rows,
+    }
+    with open(args.output, "w") as f:
+        json.dump(profile, f, indent=2)
+        f.write("\n")
+    print(json.dumps(profile["recommended"], indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,224 @@
+"""
+Retained-mode renderer for the holographic wireframe hand.
+
+The mesh topology is built once at import time and every canvas item is
+created once; each update only moves the existing items with canvas.coords().
+HandAnimator redraws it at a fixed display rate from a smoothing.PoseTrack,
+independently of how often inference delivers a new pose.
+"""
+import time
+import tkinter as tk
+
+import numpy as np
+
+from smoothing import PoseTrack
+
+# Target: Deep blue/cyan holographic wireframe palette
+COLORS = {
+    "glow_high": "#00FFFF",     # Bright Cyan for major lines/joints
+    "glow_medium": "#00AAFF",   # Slightly darker blue for secondary mesh
+    "mesh_base": "#0055AA",     # Deep Blue for subtle background wireframe
+    "mesh_high": "#0099FF",     # Brighter blue for dense mesh structure
+}
+
+# --- Define connections for maximum density ---
+
+# 1. Standard connections (Bones) - same pairs as mp_hands.HAND_CONNECTIONS
+SKELETAL_CONNECTIONS = [
+    (0, 1), (1, 2), (2, 3), (3, 4),         # Thumb
+    (0, 5), (5, 6), (6, 7), (7, 8),         # Index
+    (9, 10), (10, 11), (11, 12),            # Middle
+    (13, 14), (14, 15), (15, 16),           # Ring
+    (0, 17), (17, 18), (18, 19), (19, 20),  # Pinky
+    (5, 9), (9, 13), (13, 17),              # Palm
+]
+
+# 2. Palm and Wrist Cross-Links (Base structure)
+PALM_LINKS = [
+    (0, 5), (0, 9), (0, 13), (0, 17),  # Wrist to MCPs
+    (5, 9), (9, 13), (13, 17),        # Across MCPs
+    (1, 5), (2, 5), (1, 17), (2, 9),  # Diagonal links
+    (0, 8), (0, 12), (0, 16), (0, 20) # Wrist to finger tips (to create longitudinal lines)
+]
+
+
+def _dense_mesh_links():
+    links = []
+
+    # Cross-segment links (skipping one joint, e.g. PIP to DIP)
+    for finger_start_idx in [1, 5, 9, 13, 17]:
+        if finger_start_idx + 2 < 21: links.append((finger_start_idx, finger_start_idx + 2))
+        if finger_start_idx + 3 < 21: links.append((finger_start_idx + 1, finger_start_idx + 3))
+
+    # Horizontal/Webbing Links (Connecting adjacent fingers at the same level)
+    for i in range(1, 4): # Thumb to Index MCP/Wrist area links
+        if i + 4 < 21: links.append((i, i + 4))
+
+    # Links across all finger segments (MCP, PIP, DIP, TIP to next finger)
+    for i in range(5, 17, 4):
+        for j in range(4): # 0=MCP, 1=PIP, 2=DIP, 3=TIP
+            links.append((i + j, i + j + 4)) # E.g., MCP 5 to MCP 9
+    return links
+
+
+# 3. Dense Cross-Segment and Volumetric Links (Creating the mesh)
+DENSE_MESH_LINKS = _dense_mesh_links()
+
+# Deep Palm Triangulation (Filling the wrist/palm area)
+DEEP_PALM_TRIANGULATION = [
+    (0, 1), (0, 2), (0, 3), (0, 4),
+    (1, 9), (5, 13), (9, 17),
+    (2, 13), (3, 17), (1, 13), (5, 17),
+    (0, 6), (0, 10), (0, 14), (0, 18), # Wrist to mid-finger joints
+    (5, 10), (9, 14), (13, 18), # Extra palm diagonals
+]
+
+# Combine all mesh lines, de-duplicated with consistently sorted index pairs
+ALL_MESH_CONNECTIONS = sorted(set(
+    tuple(sorted(c))
+    for c in SKELETAL_CONNECTIONS + PALM_LINKS + DENSE_MESH_LINKS + DEEP_PALM_TRIANGULATION
+))
+
+MESH_PAIRS = np.array(ALL_MESH_CONNECTIONS, dtype=np.intp)
+BONE_PAIRS = np.array(SKELETAL_CONNECTIONS, dtype=np.intp)
+FINGERTIPS = np.array([4, 8, 12, 16, 20], dtype=np.intp)
+ARC_CENTERS = np.array([0, 4, 8, 12, 16], dtype=np.intp)  # Energy arcs around every 4th landmark
+
+JOINT_SIZE = 6
+RING_SIZE = JOINT_SIZE + 4
+ARC_RADIUS = 30
+
+
+def project_points(points, canvas_width, canvas_height, scale):
+    """
+    Pure 2D mapping of normalized (21, 3) landmarks to integer canvas (x, y),
+    mirrored on X for a natural perspective and clamped 10px inside the canvas.
+    """
+    points = np.asarray(points)
+    xy = np.empty((points.shape[0], 2))
+    xy[:, 0] = canvas_width / 2 + ((1 - points[:, 0]) - 0.5) * scale
+    xy[:, 1] = canvas_height / 2 + (points[:, 1] - 0.5) * scale
+    np.trunc(xy, out=xy)
+    xy[:, 0].clip(10, canvas_width - 10, out=xy[:, 0])
+    xy[:, 1].clip(10, canvas_height - 10, out=xy[:, 1])
+    return xy.astype(np.int32)
+
+
+class VirtualHandRenderer:
+    """Draws the wireframe on a tk.Canvas. Must be used from the Tk main thread."""
+
+    def __init__(self, canvas, canvas_width=380, canvas_height=580, scale=350):
+        self.canvas = canvas
+        self.canvas_width = canvas_width
+        self.canvas_height = canvas_height
+        self.scale = scale
+        self.visible = False
+        self._create_items()
+
+    def _create_items(self):
+        c = self.canvas
+        # Creation order is stacking order: mesh, bones, joints, rings, arcs
+        self.mesh_items = [
+            c.create_line(0, 0, 0, 0, fill=COLORS["mesh_high"], width=1,
+                          tags="mesh_line", state="hidden")
+            for _ in range(len(MESH_PAIRS))
+        ]
+        self.bone_items = [
+            c.create_line(0, 0, 0, 0, fill=COLORS["glow_high"], width=5,
+                          capstyle=tk.ROUND, tags="bone_glow", state="hidden")
+            for _ in range(len(BONE_PAIRS))
+        ]
+        self.joint_items = [
+            c.create_oval(0, 0, 0, 0, fill=COLORS["glow_high"], outline="",
+                          tags=f"joint_glow_{idx}", state="hidden")
+            for idx in range(21)
+        ]
+        self.ring_items = [
+            c.create_oval(0, 0, 0, 0, outline=COLORS["glow_medium"], width=1,
+                          tags=f"fingertip_ring_{idx}", state="hidden")
+            for idx in FINGERTIPS
+        ]
+        self.arc_items = [
+            c.create_arc(0, 0, 0, 0, start=0, extent=40, outline=COLORS["glow_high"],
+                         style="arc", width=2, tags="energy_arc", state="hidden")
+            for _ in range(len(ARC_CENTERS))
+        ]
+        self.all_items = (self.mesh_items + self.bone_items + self.joint_items
+                          + self.ring_items + self.arc_items)
+
+    def update(self, points):
+        """Move every item to the pose of `points`, a (21, 3) normalized landmark array."""
+        xy = project_points(points, self.canvas_width, self.canvas_height, self.scale)
+        coords = self.canvas.coords
+
+        for item, row in zip(self.mesh_items, xy[MESH_PAIRS].reshape(-1, 4).tolist()):
+            coords(item, *row)
+        for item, row in zip(self.bone_items, xy[BONE_PAIRS].reshape(-1, 4).tolist()):
+            coords(item, *row)
+
+        joint_boxes = np.hstack((xy - JOINT_SIZE, xy + JOINT_SIZE)).tolist()
+        for item, box in zip(self.joint_items, joint_boxes):
+            coords(item, *box)
+        ring_xy = xy[FINGERTIPS]
+        for item, box in zip(self.ring_items, np.hstack((ring_xy - RING_SIZE, ring_xy + RING_SIZE)).tolist()):
+            coords(item, *box)
+
+        # Animated energy arcs rotate with wall-clock time
+        t = time.time() * 2
+        arc_xy = xy[ARC_CENTERS]
+        for i, (item, box) in enumerate(zip(self.arc_items, np.hstack((arc_xy - ARC_RADIUS, arc_xy + ARC_RADIUS)).tolist())):
+            coords(item, *box)
+            self.canvas.itemconfigure(item, start=(t * 50 + i * 60) % 360)
+
+        if not self.visible:
+            for item in self.all_items:
+                self.canvas.itemconfigure(item, state="normal")
+            self.visible = True
+
+    def clear(self):
+        """Hide the wireframe without destroying the canvas items."""
+        if self.visible:
+            for item in self.all_items:
+                self.canvas.itemconfigure(item, state="hidden")
+            self.visible = False
+
+
+class HandAnimator:
+    """
+    Drives a VirtualHandRenderer from a PoseTrack at `fps` on the Tk main
+    thread. push() and lose() may be called from any thread.
+    """
+
+    def __init__(self, renderer, fps=60, track=None):
+        self.renderer = renderer
+        self.interval_ms = max(1, round(1000 / fps))
+        self.track = track or PoseTrack()
+        self.frames = 0
+        self._last = None
+        self._after_id = None
+
+    def push(self, points, captured_at):
+        self.track.push(points, captured_at)
+
+    def lose(self):
+        self.track.clear()
+
+    def start(self):
+        if self._after_id is None:
+            self._tick()
+
+    def stop(self):
+        if self._after_id is not None:
+            self.renderer.canvas.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _tick(self):
+        points = self.track.sample()
+        if points is None:
+            self.renderer.clear()
+        elif points is not self._last:
+            # A held pose comes back as the same array: nothing to move
+            self.renderer.update(points)
+            self.frames += 1
+        self._last = points
+        self._after_id = self.renderer.canvas.after(self.interval_ms, self._tick)